@@ -22,7 +22,7 @@ pp = PrettyPrinter().pprint  # for dev purposes
 
 class Minesweeper:
 
-    def __init__(self, rows: int, cols: int, mine_spawn: float, chars_config: dict = None):
+    def __init__(self, rows: int, cols: int, mine_spawn: float, chars_config: dict = None, seed: int = None, game: int = 0):
         """ config dictionary that holds the character strings
         that map to each game/board element; e.g. mine = 'X' """
         self.chars = {'tile': '▢',#□
@@ -33,6 +33,10 @@ class Minesweeper:
                       } if chars_config is None else chars_config  # if custom characters are provided
         # other chars I might use: █🅱️💥💣
 
+        # random streams, every game's board and solver seeds come from the master seed (random if None)
+        self.seed = seed  # master seed
+        self.game_number = game  # which game of the master seed is being played (regen_game moves to the next one)
+
         self.set_up_game(rows, cols, mine_spawn)
 
     def set_up_game(self, rows, cols, prob):
@@ -49,6 +53,8 @@ class Minesweeper:
 
         # NOTE: I started initializing mine_count and mask_tile_count in their respective board generation functions
 
+        self.start_streams(self.game_number)  # seeds the board and solver streams of this game
+
         # the different boards (external viewed by player and internal only viewed by code)
         self.mines = self.gen_mine_board()  # boolean matrix representing the board's mines
         self.game = self.gen_game_board()  # internal board, stores the mines and numbers
@@ -59,14 +65,26 @@ class Minesweeper:
             Essentially resetting same game back to beginning. """
         self.mask = self.gen_mask_board()
 
-    def regen_game(self):
+    def regen_game(self, safe: tuple[int, int] = None):
         """ Regenerates all boards, completely new game.
             Since we're regenerating the mines and recounting on the mine board,
-            it's a whole different game (not same as reset_game()). """
-        self.mines = self.gen_mine_board()
+            it's a whole different game (not same as reset_game()).
+            With a safe coord it's the same game number regenerated around the first drop instead. """
+        self.start_streams(self.game_number if safe is not None else self.game_number + 1)
+        self.mines = self.gen_mine_board(safe)
         self.game = self.gen_game_board()
         self.mask = self.gen_mask_board()
 
+    def start_streams(self, game: int):
+        """ Starts the board's and the solver's random streams for the given game number of the master seed. """
+        self.game_number = game
+        if self.seed is None:  # no master seed, fresh unseeded streams
+            self.board_random, self.solver_random = random.Random(), random.Random()
+        else:
+            # string seeds get hashed (sha512) by random, so every game/stream pair gets an independent stream
+            self.board_random = random.Random(f'{self.seed}:{game}:board')  # board generation stream
+            self.solver_random = random.Random(f'{self.seed}:{game}:solver')  # solver decisions stream
+
     def iswin(self) -> bool:
         """ Checks if the player won by comparing mine count to unrevealed count. """
         return self.area - self.revealed_count == self.mine_count
@@ -80,17 +98,24 @@ class Minesweeper:
 
         return self.is_new(row, col) and self.game[row][col] is True
 
-    def gen_mine_board(self) -> list[list]:
-        """ Generates a mine board (boolean matrix) based on given probability. """
+    def gen_mine_board(self, safe: tuple[int, int] = None) -> list[list]:
+        """ Generates a mine board (boolean matrix) based on given probability.
+            If a safe coord is given, no mines are placed on it or its adjacent tiles (so it's a zero). """
+        # probabilities of 1 or more are a mine count instead
+        if self.prob >= 1:
+            return self.gen_mine_board_by_count(self.prob, safe)
+
         self.mine_count = 0  # stores total number of mines
         mine_board = []
 
-        # NOTE: using underscore to signify that this value isn't actually used and is just for iterating
-        for _row in range(self.rows):
+        for row in range(self.rows):
             mine_board.append([])  # append new row list
-            for _col in range(self.cols):
+            for col in range(self.cols):
+                # safe tiles never get a mine
+                if safe is not None and abs(row - safe[0]) <= 1 and abs(col - safe[1]) <= 1:
+                    mine_board[-1].append(False)
                 # randomly generates bomb
-                if random.random() < self.prob:
+                elif self.board_random.random() < self.prob:
                     mine_board[-1].append(True)
                     self.mine_count += 1
                 else:
@@ -98,22 +123,41 @@ class Minesweeper:
 
         return mine_board
 
-    # TODO: mine board generation by number of mines
-    # def gen_mine_board_by_count(self, mines: int) -> list[list]:
-    #     """ Generates a mine board (boolean matrix) based on desired mine count. """
-    #     self.mine_count = mines  # stores total number of mines
-    #     mine_board = [[False for c in range(self.cols)] for r in range(self.rows)]
+    def gen_mine_board_by_count(self, mines: int, safe: tuple[int, int] = None) -> list[list]:
+        """ Generates a mine board (boolean matrix) based on desired mine count.
+            If a safe coord is given, no mines are placed on it or its adjacent tiles (so it's a zero). """
+        self.mine_count = mines  # stores total number of mines
+        mine_board = [[False for c in range(self.cols)] for r in range(self.rows)]
+
+        # flat indices (row * cols + col) of the safe tiles, these can't get a mine
+        excluded = [] if safe is None else [r * self.cols + c for r, c in self.adjacent_nodes(safe)] + [safe[0] * self.cols + safe[1]]
+
+        for index in self.sample_indices(mines, excluded):
+            mine_board[index // self.cols][index % self.cols] = True
+
+        return mine_board
+
+    def sample_indices(self, count: int, excluded: list[int] = ()) -> list[int]:
+        """ Samples count distinct flat indices of the board without replacement, skipping the excluded indices.
+            Partial Fisher-Yates shuffle over a virtual array of the allowed tiles, storing only the swapped positions,
+            so it takes time linear in the count at any density (same as the GUI's generation.sample_indices). """
+        size = self.area - len(excluded)  # number of indices that can be picked
+        if count > size:
+            raise ValueError(f'{count} mines don\'t fit in the {size} tiles that are allowed to have one')
+
+        # partial shuffle: position i swaps with a random position in [i, size), then position i is final
+        swapped = {}  # position -> value, for the positions of the virtual array that don't hold their own value
+        sample = []
+        for i in range(count):
+            j = self.board_random.randrange(i, size)
+            sample.append(swapped.get(j, j))
+            swapped[j] = swapped.get(i, i)
 
-    #     # generate 'mines' number of random coords
-    #     for _ in range(mines):
-    #         # NOTE: this is a do while. you write the do code, then you exit when it becomes opposite of your desire while
-    #         while True:
-    #             rr, cc = random.randrange(self.rows), random.randrange(self.cols)
-    #             if mine_board[rr][cc] is False:
-    #                 mine_board[rr][cc] = True
-    #                 break
+        # the sample is ranks among the allowed tiles, shift every rank past the excluded indices at or below it
+        for index in sorted(excluded):
+            sample = [rank + 1 if rank >= index else rank for rank in sample]
 
-    #     return mine_board
+        return sample
 
     def gen_game_board(self) -> list[list]:
         """ Generates a game board by traversing copy of mine board and writing mine counts. """
@@ -150,9 +194,9 @@ class Minesweeper:
         return [[False for c in range(self.cols)] for r in range(self.rows)]
 
     def find_empty_drop(self, row, col):
-        """ Regenerates game board until empty spot is found. """
-        while not self.empty_spot(row, col):
-            self.regen_game()
+        """ Regenerates game board once with no mines around the given spot, so it's empty. """
+        if not self.empty_spot(row, col):
+            self.regen_game(safe=(row, col))
 
     def display_mines(self, ascii: bool = False):
         """ Iterates through mine board and prints mine status (dev function). """
@@ -3,7 +3,6 @@ from pprint import PrettyPrinter
 from collections import deque
 from cli_game import Minesweeper
 from time import sleep, time
-from random import randint
 from cli_colors import *
 import sys
 
@@ -28,8 +27,8 @@ pp = PrettyPrinter().pprint  # for dev stuff
 class Solver(Minesweeper):
     """ Solver bot only has access to what a regular player could see, so it's completely fair. """
 
-    def __init__(self, rows: int, cols: int, mine_spawn: float, chars_config: dict = None):
-        super().__init__(rows, cols, mine_spawn, chars_config)
+    def __init__(self, rows: int, cols: int, mine_spawn: float, chars_config: dict = None, seed: int = None, game: int = 0):
+        super().__init__(rows, cols, mine_spawn, chars_config, seed, game)
         self.solver_mask = self.gen_boolean_matrix()  # visual overlay that keeps track of the solver's progress
         self.solved = self.gen_boolean_matrix()  # stores a boolean matrix of the solved tiles
         self.solved_count = 0  # keeps count of number of solved tiles
@@ -85,7 +84,7 @@ class Solver(Minesweeper):
 
         # first move
         row, col = self.random_coords()  # picks random spot for first move
-        self.find_empty_drop(row, col)  # regen board until there's a zero first move
+        self.find_empty_drop(row, col)  # regen board so there's a zero first move
         self.reveal(row, col)  # reveals spot once the 0 is found
         space()
 
@@ -700,7 +699,7 @@ class Solver(Minesweeper):
 
     def random_coords(self) -> tuple[int, int]:
         """ Randomly generates coords. """
-        return randint(0, self.rows-1), randint(0, self.cols-1)
+        return self.solver_random.randint(0, self.rows-1), self.solver_random.randint(0, self.cols-1)
 
     def unvisited_random(self) -> tuple[int, int]:
         """ Randomly generates coords that haven't been visited yet. """
@@ -12,8 +12,8 @@ DEFAULT_MINE_CHANCE = .15 # default mine probability
 
 class User(Minesweeper):
 
-    def __init__(self, rows: int, cols: int, mine_spawn: float, chars_config: dict = None):
-        super().__init__(rows, cols, mine_spawn, chars_config)
+    def __init__(self, rows: int, cols: int, mine_spawn: float, chars_config: dict = None, seed: int = None, game: int = 0):
+        super().__init__(rows, cols, mine_spawn, chars_config, seed, game)
 
     def play(self):
         """ Starts game by running start and update function (remember Unity). """
@@ -35,7 +35,7 @@ class User(Minesweeper):
             return 'q'
         mode, last_move, row, col = input_check
 
-        self.find_empty_drop(row, col)  # regen board until there's a zero under choice
+        self.find_empty_drop(row, col)  # regen board so there's a zero under choice
         self.reveal(row, col)  # reveals spot once the 0 is found
         space()
 
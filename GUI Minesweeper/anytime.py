@@ -0,0 +1,131 @@
+""" Time-budgeted move decisions, for interactive play and bot arenas where every move has a latency limit.
+The solver's stages run cheapest first and the deadline is checked between them (and between components inside them),
+so when the budget runs out there's always a decision to return: the certain moves found so far if there are any,
+else a guess from the best probabilities computed so far, along with whether the answer is exact. """
+
+from time import perf_counter
+from constants import *
+
+
+CHECK_INTERVAL = 1024  # steps between deadline checks (placements while backtracking, tiles while scanning, SAT search rounds)
+
+
+class OutOfTime(Exception):
+    """ Raised inside a stage's search to unwind it when the deadline passes. """
+
+
+class Deadline:
+    """ Point in time a move has to be decided by (no budget means no deadline). """
+
+    def __init__(self, budget: float = None):
+        self.end = None if budget is None else perf_counter() + budget
+
+    def expired(self) -> bool:
+        """ Returns whether the deadline has passed. """
+        return self.end is not None and perf_counter() >= self.end
+
+    def remaining(self) -> float or None:
+        """ Returns the seconds left before the deadline (None if there's no deadline). """
+        return None if self.end is None else max(0.0, self.end - perf_counter())
+
+
+class Decision:
+    """ Result of a move decision: the tiles certain to be safe and the tiles certain to be mines,
+    or when there are none, the tile to guess and its probability of being a mine. """
+    """ NOTE: exact means the certain tiles were proven, or the guess was chosen from exact probabilities,
+    it's False when the deadline (or a component too big to count) forced an estimate or sampling. """
+
+    __slots__ = ('safe', 'mines', 'guess', 'probability', 'exact', 'stage')
+
+    def __init__(self, safe: set[int] = None, mines: set[int] = None, guess: int = None, probability: float = 0.0, exact: bool = True, stage: str = ''):
+        self.safe = safe if safe is not None else set()  # flat indices of tiles certain to be safe
+        self.mines = mines if mines is not None else set()  # flat indices of tiles certain to be mines
+        self.guess = guess  # flat index of the tile to reveal when nothing is certain (None if nothing is left)
+        self.probability = probability  # probability of the guess being a mine
+        self.exact = exact
+        self.stage = stage  # name of the stage that decided
+
+    def is_certain(self) -> bool:
+        """ Returns whether the decision has certain moves (no guessing needed). """
+        return len(self.safe) + len(self.mines) > 0
+
+    def __repr__(self) -> str:
+        if self.is_certain():
+            return f'Decision({len(self.safe)} safe, {len(self.mines)} mines, stage={self.stage}, exact={self.exact})'
+        return f'Decision(guess={self.guess}, p={self.probability:.3f}, stage={self.stage}, exact={self.exact})'
+
+
+def trivial_moves(board, numbers: set[int] = None, deadline: Deadline = None) -> tuple[set[int], set[int]]:
+    """ Returns the tiles made safe or mines by a single number (simple solve over every number, read from the neighbour counters).
+    Only the given numbers are read if there are any (the border numbers), and the scan stops early if the deadline passes. """
+    safe, mines = set(), set()
+    states, values, hidden = board.states, board.values, board.hidden
+
+    for step, index in enumerate(range(board.area) if numbers is None else numbers):
+        if deadline is not None and step % CHECK_INTERVAL == CHECK_INTERVAL - 1 and deadline.expired():
+            break
+        if states[index] != REVEALED or hidden[index] == 0 or not 0 < values[index] < MINE_VALUE:
+            continue
+        mines_left = values[index] - board.flags[index]
+        if mines_left == 0:  # every unrevealed neighbour is safe
+            safe.update(adj for adj in board.adjacent_indices(index) if states[adj] == UNREVEALED)
+        elif mines_left == hidden[index]:  # every unrevealed neighbour is a mine
+            mines.update(adj for adj in board.adjacent_indices(index) if states[adj] == UNREVEALED)
+
+    return safe, mines
+
+def local_guess(board, numbers: set[int] = None) -> tuple[int or None, float]:
+    """ Returns a quick guess when there's no time for anything else, the unrevealed tile with the lowest estimate:
+    the worst mines left over unrevealed neighbours ratio of the numbers around it, or the mine density left if none.
+    Only the numbers bordering the frontier are read (the given ones, or every number of the board if none are given),
+    the interior tiles all share the density so any one of them will do. """
+    states, values, hidden = board.states, board.values, board.hidden
+    unrevealed = states.count(UNREVEALED)
+    if unrevealed == 0:
+        return None, 0.0
+    density = max(0, board.mine_count - states.count(FLAGGED)) / unrevealed
+
+    # every frontier tile gets the worst ratio of the numbers around it
+    estimates = {}
+    for index in (range(board.area) if numbers is None else numbers):
+        if states[index] != REVEALED or hidden[index] == 0 or not 0 < values[index] < MINE_VALUE:
+            continue
+        ratio = (values[index] - board.flags[index]) / hidden[index]
+        for adj in board.adjacent_indices(index):
+            if states[adj] == UNREVEALED and estimates.get(adj, -1.0) < ratio:
+                estimates[adj] = ratio
+
+    best, best_estimate = None, 2.0
+    for index, estimate in estimates.items():
+        if estimate < best_estimate or (estimate == best_estimate and index < best):
+            best, best_estimate = index, estimate
+    if density < best_estimate:
+        interior = interior_tile(board, estimates.keys())
+        if interior is not None:
+            best, best_estimate = interior, density
+
+    return best, best_estimate
+
+def interior_tile(board, frontier: set[int]) -> int or None:
+    """ Returns the first unrevealed tile outside the frontier (None if there's none), the states are searched
+    with bytearray.find so the revealed stretches in between get skipped at C speed. """
+    states, index = board.states, -1
+    while True:
+        index = states.find(UNREVEALED, index + 1)
+        if index == -1 or index not in frontier:
+            return None if index == -1 else index
+
+def best_guess(board, probabilities: dict[int, float], interior_probability: float, frontier: set[int]) -> tuple[int or None, float]:
+    """ Returns the unrevealed tile least likely to be a mine and its probability, interior tiles (outside the frontier)
+    all share the interior probability so the first one stands for all of them. """
+    best, best_probability = None, 2.0
+    for index, probability in probabilities.items():
+        if probability < best_probability:
+            best, best_probability = index, probability
+
+    if interior_probability < best_probability:
+        interior = interior_tile(board, frontier)
+        if interior is not None:
+            best, best_probability = interior, interior_probability
+
+    return best, best_probability
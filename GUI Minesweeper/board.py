@@ -0,0 +1,401 @@
+# data structures
+from collections import deque
+
+# board generation
+from generation import generate_mine_arrays, neighbour_table, derive_seeds
+from zobrist import zobrist_key, FLAG_CODE
+import numpy as np
+import random
+
+# miscellaneous
+from constants import *
+from typing import Generator
+
+""" This is the headless game engine, the rules of Minesweeper with no pygame, fonts or window.
+gui_game.py puts the visuals on top of it by overriding the drawing hooks at the bottom of Board,
+so batch jobs on servers can just create a Board and play it directly. """
+
+
+class Node:
+    """ Thin view of a tile, the tile's data itself lives in the board's flat arrays (indexed by flat index).
+    Nodes are only created when something asks for one and aren't kept, the board doesn't need them.
+    Two views of the same tile are equal (and hash the same), so nodes still work in sets and as dict keys. """
+
+    __slots__ = ('parent', 'index')  # no per node dict, a node is just a board reference and an index
+
+    def __init__(self, board, index: int):
+        self.parent = board  # board class that holds the tile's data
+        self.index = index  # flat index of the tile (row * cols + col)
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, Node) and self.index == other.index and self.parent is other.parent
+
+    def __hash__(self) -> int:
+        return self.index
+
+    @property
+    def row(self) -> int:
+        """ Returns node's row on the board. """
+        return self.index // self.parent.cols
+
+    @property
+    def col(self) -> int:
+        """ Returns node's column on the board. """
+        return self.index % self.parent.cols
+
+    @property
+    def value(self) -> bool or int:
+        """ Returns minesweeper tile value (0 to 8, or True if mine). """
+        value = self.parent.values[self.index]
+        return True if value == MINE_VALUE else value
+
+    @property
+    def state(self) -> int:
+        """ Returns current state of the node (UNREVEALED, REVEALED, FLAGGED or MINE). """
+        return self.parent.states[self.index]
+
+    @state.setter
+    def state(self, state: int):
+        """ Sets current state of the node. """
+        self.parent.states[self.index] = state
+
+    @property
+    def mark(self) -> int:
+        """ Returns the node's mark (annotation that only changes how it's drawn). """
+        return self.parent.marks[self.index]
+
+    @mark.setter
+    def mark(self, mark: int):
+        """ Sets the node's mark. """
+        self.parent.marks[self.index] = mark
+
+    @property
+    def solved(self) -> bool:
+        """ Returns whether node was marked as solved by the solver. """
+        return self.parent.solved[self.index] == 1
+
+    @solved.setter
+    def solved(self, solved: bool):
+        """ Marks node as solved (or not) in the solved array. """
+        self.parent.solved[self.index] = solved
+
+    @property
+    def x(self) -> int:
+        """ Returns node's pixel x coord in the pygame window (only used by the frontend). """
+        return self.col * self.parent.cell_size
+
+    @property
+    def y(self) -> int:
+        """ Returns node's pixel y coord in the pygame window (only used by the frontend). """
+        return self.row * self.parent.cell_size
+
+    def get_coord(self) -> Coord:
+        """ Returns node's coordinate. """
+        return (self.row, self.col)
+
+    # FIXME: trying to decide if this should automatically reveal to mine
+    def reveal(self):
+        """ Set node state to revealed, or to mine if its value is a mine. """
+        self.state = REVEALED if self.value is not True else MINE
+
+    def unreveal(self):
+        """ Set node state to unrevealed. """
+        self.state = UNREVEALED
+
+    def flag(self) -> bool:
+        """ Flags node. """
+        self.state = FLAGGED
+
+    # NOTE: to check if node is unrevealed OR flagged, do !is_revealed()
+    def is_revealed(self) -> bool:
+        """ Returns whether node is revealed. """
+        return self.parent.states[self.index] == REVEALED
+
+    def is_unrevealed(self) -> bool:
+        """ Returns whether node is unrevealed. """
+        return self.parent.states[self.index] == UNREVEALED
+
+    def is_flagged(self) -> bool:
+        """ Returns whether node is flagged. """
+        return self.parent.states[self.index] == FLAGGED
+
+    def is_empty(self) -> bool:
+        """ Returns whether node is an empty area (zero). """
+        return self.value == 0
+
+    def is_chain(self) -> bool:
+        """ Returns whether node is a chain node (integer over zero). """
+        return type(self.value) is int and self.value > 0
+
+    def is_mine(self) -> bool:
+        """ Returns whether node is a mine. """
+        return self.value is True
+
+    def is_solved(self) -> bool:
+        """ Returns whether node is marked as solved. """
+        return self.solved
+
+class Board:
+    """ Game logic only (generation, reveal, flood fill, chord, flag, win/loss), NO VISUALS, NO INPUT.
+    Minesweeper subclasses this and fills in the drawing hooks to show the game in a pygame window. """
+
+    def __init__(self, rows: int = ROWS, cols: int = COLS, mine_spawn: float or int = MINE_SPAWN, seed: int = None, game: int = 0):
+        # board properties
+        self.rows, self.cols = rows, cols  # board dimensions
+        self.area = rows * cols  # number of total tiles
+        self.mine_spawn = mine_spawn  # probability of mine spawn
+
+        # random streams, every game's board and solver seeds come from the master seed (random if None)
+        self.seed = seed  # master seed
+        self.game_number = game  # which game of the master seed is being played (new_game moves to the next one)
+
+        # game setup
+        self.revealed_count = 0  # keeps track of how many tiles were revealed (not flagged)
+        # mine count is initialized in self.generate_board_values()
+        self.initialize_board()
+
+    # === GAME SETUP FUNCTIONS ===
+    def start_streams(self, game: int):
+        """ Starts the board's and the solver's random streams for the given game number of the master seed. """
+        self.game_number = game
+        if self.seed is None:  # no master seed, fresh unseeded streams
+            self.generator, self.solver_random = np.random.default_rng(), random.Random()
+        else:
+            board_seed, solver_seed = derive_seeds(self.seed, game)
+            self.generator = np.random.default_rng(board_seed)  # board generation stream
+            self.solver_random = random.Random(solver_seed)  # solver decisions stream
+
+    def generate_board_values(self, safe: Coord = None) -> bytearray:
+        """ Generates the mines and mine counts (vectorised) and returns the flat array of tile values.
+        If a safe coord is given, no mines are placed on it or around it (so it's guaranteed to be a zero). """
+        mines, counts = generate_mine_arrays(self.rows, self.cols, self.mine_spawn, self.generator, safe)
+        self.mine_count = int(mines.sum())  # stores total number of mines
+
+        # tile values are the mine counts, except mines are MINE_VALUE
+        counts[mines] = MINE_VALUE
+        return bytearray(counts.tobytes())
+
+    def initialize_board(self):
+        """ Generates a board by generating mines and mine counts then setting up the tile arrays. """
+        """ NOTE: the board is stored as a struct of arrays, one flat byte array per tile property
+        (value, state, mark, solved) indexed by flat index, instead of one Node object per tile.
+        Nodes are just views into these arrays, created when asked for (see node_at). """
+        self.start_streams(self.game_number)
+        self.values = self.generate_board_values()  # tile values (0 to 8, or MINE_VALUE)
+        self.states = bytearray(self.area)  # node states, all UNREVEALED (0)
+        self.marks = bytearray(self.area)  # node marks, all NO_MARK (0)
+        self.solved = bytearray(self.area)  # solver's solved marks, all unsolved
+
+        # neighbour shapes + offsets of the board (only computed once, never changes for the board)
+        self.adjacency, self.offsets = neighbour_table(self.rows, self.cols)
+        self.neighbour_counts = bytearray(len(self.offsets[shape]) for shape in self.adjacency)  # in bounds neighbours of every tile
+
+        # neighbour counters, kept up to date by reveal_node and flag so nothing has to scan the 8 neighbours
+        self.hidden = bytearray(self.neighbour_counts)  # unrevealed neighbours of every tile, all of them to start
+        self.flags = bytearray(self.area)  # flagged neighbours of every tile
+
+        # zobrist hash of the visible board (revealed numbers and flags), kept up to date by reveal_node and flag
+        self.position_hash = 0
+
+    def new_game(self, safe: Coord = None):
+        """ Generates new game (the next game number) by regenerating mines/counts and unrevealing all nodes. """
+        self.start_streams(self.game_number + 1)
+        self.values = self.generate_board_values(safe)  # regenerates mines and counts
+        self.reset_game()
+
+    def reset_game(self):
+        """ Sets all tiles back to unrevealed but doesn't regenerate game board values. """
+        self.revealed_count = 0
+        self.states = bytearray(self.area)  # all UNREVEALED (0)
+        self.marks = bytearray(self.area)  # all NO_MARK (0)
+        self.hidden = bytearray(self.neighbour_counts)  # every neighbour is unrevealed again
+        self.flags = bytearray(self.area)  # no flags
+        self.position_hash = 0  # nothing visible
+
+    def generate_empty_drop(self, node: Node):
+        """ Regenerates board once with no mines on or around the given node, so it's an empty spot. """
+        if not node.is_empty():
+            # same game number, restarting its streams so the board only depends on the seed, game and first click
+            self.start_streams(self.game_number)
+            self.values = self.generate_board_values(safe=node.get_coord())
+            self.reset_game()
+
+    # === HELPER FUNCTIONS ===
+    def gen_matrix(self, default=None) -> list[list]:
+        """ Generates a 2D array the size of the board consisting of the given default value. """
+        nested_arr = [] if default is None else [default]*self.cols
+        return [nested_arr for _ in range(self.rows)]
+
+    def get_node(self, r: int, c: int) -> Node:
+        """ Returns the node at the given coord. """
+        return self.node_at(r * self.cols + c)
+
+    def node_at(self, index: int) -> Node:
+        """ Returns a view of the node at the given flat index (a new one every time, views aren't kept around,
+        so walking the whole board doesn't leave an object behind for every tile). """
+        return Node(self, index)
+
+    def adjacent_indices(self, index: int) -> list[int]:
+        """ Returns the flat indices adjacent to the given flat index (read from the neighbour table). """
+        return [index + offset for offset in self.offsets[self.adjacency[index]]]
+
+    def adjacent_coords(self, r: int, c: int) -> Generator[Coord, None, None]:
+        """ Returns the coords adjacent to the given coord. """
+        for adj in self.adjacent_indices(r * self.cols + c):
+            yield divmod(adj, self.cols)
+
+    def adjacent_nodes(self, node: Node) -> list[Node]:
+        """ Returns the nodes adjacent to the given node (read from the neighbour table). """
+        index = node.index
+        return [self.node_at(index + offset) for offset in self.offsets[self.adjacency[index]]]
+
+    def loop_all_nodes(self) -> Generator[Node, None, None]:
+        """ Generator that yields all nodes in the grid (gets rid of need for 2 loops). """
+        for index in range(self.area):
+            yield self.node_at(index)
+
+    def loop_all_coords(self) -> Generator[Coord, None, None]:
+        """ Generator that yields coords of all nodes in the grid (gets rid of need for 2 loops). """
+        for r in range(self.rows):
+            for c in range(self.cols):
+                yield (r, c)
+
+    def enum_all_coords(self) -> Generator[tuple[Coord, Node], None, None]:
+        """ Generator that yields coords and node pairs of all nodes in the grid (gets rid of need for 2 loops). """
+        for index in range(self.area):
+            yield divmod(index, self.cols), self.node_at(index)
+
+    def offset_coord(self, coord: Coord, offset: tuple[int, int]) -> Coord:
+        """ Returns a coord offset by the given offset. """
+        return tuple(crd + ofst for crd, ofst in zip(coord, offset))
+
+    def in_bounds(self, r: int, c: int) -> bool:
+        """ Returns whether the given coord is within bounds. """
+        return 0 <= r < self.rows and 0 <= c < self.cols
+
+    # === SOMETHING (GETTERS?) ===
+    def is_win(self) -> bool:
+        """ Checks if the player won by comparing mine count to unrevealed count. """
+        return self.area - self.revealed_count == self.mine_count
+
+    def is_loss(self, node: Node) -> bool:
+        """ Checks if coord choice is a loss (mine). """
+        # NOTE: I should remove the is new and have that checked externally, because really the input should be sanitized before.
+        return node.is_unrevealed() and node.value is True
+
+    # === GAME FUNCTIONS ===
+    # NOTE: this is for floodfills where I want to reveal and draw a group of nodes, then display the group together
+    def reveal_node(self, node: Node):
+        """ Reveals and draws node without updating, and increments revealed counter. """
+        if node.is_flagged():  # neighbours lose a flag
+            self.update_counters(node.index, 0, -1)
+            self.position_hash ^= zobrist_key(node.index, FLAG_CODE)
+        elif node.is_unrevealed():  # neighbours lose an unrevealed tile
+            self.update_counters(node.index, -1, 0)
+        if not node.is_revealed():  # the tile's value becomes visible
+            self.position_hash ^= zobrist_key(node.index, self.values[node.index])
+        node.reveal()  # reveals node
+        self.draw_revealed(node)  # draws node (only does something in the frontend)
+        self.revealed_count += 1  # increments revealed counter
+
+    def flag(self, node: Node):
+        """ Flags node, or unflags if node was already flagged. """
+        if node.is_flagged():  # unflag if node is already flagged
+            node.unreveal()
+            self.update_counters(node.index, 1, -1)  # neighbours get an unrevealed tile back
+        else:  # node is unrevealed, flag it
+            node.flag()
+            self.update_counters(node.index, -1, 1)  # neighbours trade an unrevealed tile for a flag
+        self.position_hash ^= zobrist_key(node.index, FLAG_CODE)  # the flag shows or goes away
+        self.update_node(node)  # draws node and updates display
+
+    def update_counters(self, index: int, hidden_change: int, flag_change: int):
+        """ Applies a change of the tile's state to the neighbour counters of its adjacent tiles. """
+        hidden, flags = self.hidden, self.flags
+        for adj in self.adjacent_indices(index):
+            hidden[adj] += hidden_change
+            flags[adj] += flag_change
+
+    def reveal(self, node: Node):
+        """ Reveals given node and flood fills area if needed. """
+        # flood fill if revealed node is empty (zero)
+        if node.value == 0:
+            # NOTE: to change the type of flood fill you use, change this function
+            self.level_order_floodfill(node)
+        else:
+            # NOTE: IMPORTANT TO USE THIS SPECIFIC REVEAL FUNCTION AS IT INCREMENTS REVEALED COUNTER TOO
+            self.reveal_node(node)  # reveals and draws node
+            self.update_display()  # updates revealed node
+
+    # NOTE: helper function for chording, will also be used for solver
+    def count_flags(self, node: Node) -> int:
+        """ Returns number of adjacent flags. """
+        return self.flags[node.index]
+
+    def mines_left(self, node: Node) -> int:
+        """ Returns the number of adjacent mines that aren't flagged yet (value minus adjacent flags). """
+        return self.values[node.index] - self.flags[node.index]
+
+    def chord(self, node: Node):
+        """ Chords given node. """
+        flag_count = 0
+        # counts flags and checks for incorrect placement as it counts
+        for adj in self.adjacent_nodes(node):
+            if adj.is_flagged():
+                if not adj.is_mine():  # incorrect flag, exits function
+                    return False
+                flag_count += 1
+
+        # if flags are correct, reveals all unrevealed tiles
+        if flag_count == node.value:
+            for adj in self.adjacent_nodes(node):
+                if adj.is_unrevealed():  # specifically unrevealed, not also flagged
+                    self.reveal(adj)  # reveals and draws node
+
+        # updates all newly drawn nodes at once
+        self.update_display()
+
+    # flood fill algorithms ==
+    def level_order_floodfill(self, start: Node):
+        """ Flood fills board using level order traversal starting at given node """
+        queue = deque([start])  # append to enqueue and popleft to dequeue
+        discovered = {start.index}  # hashset keeping track of already discovered tiles (flat indices)
+        states = self.states
+
+        while len(queue) > 0:
+            breadth = len(queue)  # get length of current breadth of nodes
+
+            # iterate breadth of nodes
+            for _ in range(breadth):
+                curr = queue.popleft()  # pop node to process
+
+                # process node
+                self.reveal_node(curr)  # reveal and draw node (doesn't update) also increments revealed counter
+                if curr.value != 0:  # stops traversing this point if it hits edge of empty pool
+                    continue         # empty pool is contained by edge of number tiles (above 0)
+
+                # add adjacent nodes
+                for adj in self.adjacent_indices(curr.index):
+                    # NOTE: if node isn't new then it was processed during a different run of this function.
+                    if adj not in discovered and states[adj] == UNREVEALED:
+                        queue.append(self.node_at(adj))
+                        discovered.add(adj)
+
+            # displays whole breadth of newly drawn nodes together
+            self.delay()
+            self.update_display()
+
+    # === DRAWING HOOKS ===
+    """ NOTE: the engine calls these at the exact points where the game gets drawn,
+    they do nothing here so the engine never touches pygame. gui_game.py overrides them. """
+    def draw_revealed(self, node: Node):
+        """ Draws revealed node (no-op when headless). """
+
+    def update_node(self, node: Node):
+        """ Draws unrevealed/revealed node and updates display (no-op when headless). """
+
+    def update_display(self):
+        """ Updates display (no-op when headless). """
+
+    def delay(self, wait: float = 0):
+        """ Delay some amount of time, for animation/visual purposes (no-op when headless). """
@@ -0,0 +1,97 @@
+""" Memoised solutions of frontier components. The same small frontier shapes come up over and over (across moves and
+across every game of a batch run), so enumerated components are cached under a canonical signature of their constraints.
+The signature is taken under the 8 rotations and reflections of the grid, so a 1-2-1 along a top edge and the same 1-2-1
+along a left edge share one entry. The cache is a bounded LRU shared by the whole process, like generation's shared rng. """
+
+from collections import OrderedDict
+from sys import getsizeof
+from constants import *
+
+
+Signature = tuple[tuple[tuple[int, ...], int], ...]  # constraints as (tile ranks, mines), sorted
+
+# the 8 symmetries of the grid (rotations and reflections), applied to (row, col)
+SYMMETRIES = [
+    lambda r, c: (r, c), lambda r, c: (c, -r), lambda r, c: (-r, -c), lambda r, c: (-c, r),
+    lambda r, c: (r, -c), lambda r, c: (-r, c), lambda r, c: (c, r), lambda r, c: (-c, -r),
+]
+
+
+def canonical_form(cells: list[int], constraints: list[tuple[tuple[int, ...], int]], cols: int) -> tuple[Signature, list[int]]:
+    """ Returns the component's canonical signature and its tiles in canonical order (the tile of rank i is order[i]).
+    For every symmetry the tiles are ranked by their transformed coords and the constraints rewritten with those ranks,
+    the smallest rewrite is the signature, so components that are the same up to symmetry (and position) get the same one. """
+    coords = {cell: divmod(cell, cols) for cell in cells}
+    best, best_order = None, None
+
+    for symmetry in SYMMETRIES:
+        moved = {cell: symmetry(r, c) for cell, (r, c) in coords.items()}
+        order = sorted(cells, key=moved.get)  # ranking by transformed coords ignores where the component is
+        rank = {cell: i for i, cell in enumerate(order)}
+        signature = tuple(sorted((tuple(sorted(rank[cell] for cell in members)), mines) for members, mines in constraints))
+        if best is None or signature < best:
+            best, best_order = signature, order
+
+    return best, best_order
+
+
+class ComponentCache:
+    """ Bounded LRU cache mapping component signatures to their solution counts, with hit/miss/eviction stats. """
+
+    def __init__(self, max_entries: int = COMPONENT_CACHE_SIZE):
+        self.entries = OrderedDict()  # signature -> (totals, cell totals by rank, size in bytes), least recently used first
+        self.max_entries = max_entries
+        self.bytes = 0  # approximate memory held by the entries
+        self.hits = self.misses = self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def get(self, signature: Signature) -> tuple[dict[int, int], dict[int, list[int]]] or None:
+        """ Returns the cached counts of the signature (and marks it recently used), or None on a miss. """
+        entry = self.entries.get(signature)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(signature)
+        self.hits += 1
+        return entry[0], entry[1]
+
+    def put(self, signature: Signature, totals: dict[int, int], cell_totals: dict[int, list[int]]):
+        """ Caches the counts of the signature, evicting the least recently used entries past the size limit. """
+        if signature in self.entries:
+            return
+        size = entry_size(signature, totals, cell_totals)
+        self.entries[signature] = (totals, cell_totals, size)
+        self.bytes += size
+        while len(self.entries) > self.max_entries:
+            self.bytes -= self.entries.popitem(last=False)[1][2]
+            self.evictions += 1
+
+    def clear(self):
+        """ Empties the cache and resets its stats. """
+        self.entries.clear()
+        self.bytes = self.hits = self.misses = self.evictions = 0
+
+    def hit_rate(self) -> float:
+        """ Returns the share of lookups that were hits. """
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups > 0 else 0.0
+
+    def stats(self) -> dict[str, int or float]:
+        """ Returns the cache's stats (entries, hits, misses, evictions, hit rate and approximate memory in bytes). """
+        return {'entries': len(self.entries), 'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions,
+                'hit_rate': self.hit_rate(), 'bytes': self.bytes}
+
+
+def entry_size(signature: Signature, totals: dict[int, int], cell_totals: dict[int, list[int]]) -> int:
+    """ Returns the approximate memory of a cache entry in bytes (containers plus the ints they hold). """
+    size = getsizeof(signature) + getsizeof(totals) + getsizeof(cell_totals)
+    for members, mines in signature:
+        size += getsizeof(members) + sum(getsizeof(rank) for rank in members)
+    for mines, counts in cell_totals.items():
+        size += getsizeof(counts) + sum(getsizeof(count) for count in counts)
+    return size
+
+
+component_cache = ComponentCache()  # shared cache used by every component (across moves and games)
@@ -10,15 +10,28 @@ COLS = 40
 MINE_SPAWN = 0.15  # probability of mines spawning
 # MINE_SPAWN = 99  # number of mines
 
-# == NODE STATES/COLORS ==
-""" starred lines are colors that are also used to represent a state
-GRID_LINE: color of the lines between tiles
-TILE_NUMBER: color of the number/text on tiles, aka foreground color
-REVEALED: color of revealed tiles, aka background color                     *
-UNREVEALED: color of unrevealed tiles                                       *
-MINE: color of tiles that are mines                                         *?
-FLAG: color of unrevealed tiles that are flagged                            *
-"""
+# == NODE STATES ==
+""" the logical state of a tile, stored as a small int in the board's states array.
+the game logic and the solver only ever compare these, colors are only picked by the renderer. """
+UNREVEALED = 0
+REVEALED = 1
+FLAGGED = 2
+MINE = 3  # revealed mine (the tile that lost the game)
+
+# == NODE MARKS ==
+""" annotations left on tiles by the solver (and the end of game animations), stored in the board's
+marks array. they never change what a tile is, the renderer just maps them to the colors you see. """
+NO_MARK = 0
+CURRENT = 1  # tile the solver is currently on
+LAKE = 2  # empty tile traversed by lake scan
+BORDER = 3  # chain tile found on the border of a lake
+CHAIN_LINK = 4  # chain tile that got unioned into a chain
+CHAIN_START = 5  # starting tile of the chain being ground
+VISITED = 6  # visited but wasn't able to solve
+SOLVED = 7  # fully solved tile
+LOSS_REVEALED = 8  # tile revealed by the loss animation
+LOSS_MINE = 9  # mine revealed by the loss animation
+WIN_MINE = 10  # mine recolored by the win animation
 
 # == FRONTEND CONSTANTS ==
 WIN_HEIGHT = 900  # window height
@@ -28,4 +41,26 @@ SOLVER_WAIT = 0.002#.015  # delay animation for solver
 
 # == BACKEND CONSTANTS ==
 ADJACENT_COORDS = [(-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1)]
+MINE_VALUE = 9  # value stored for mines in the board's tile values array (counts only go up to 8)
+COMPONENT_LIMIT = 40  # biggest frontier component (in tiles) the constraint solver will enumerate
+CHAIN_WIDTH_LIMIT = 12  # most numbers open at once for a bigger component to still be counted along its chain
+PARALLEL_THRESHOLD = 24  # smallest frontier component (in tiles) worth sending to another process to enumerate
+COMPONENT_CACHE_SIZE = 100_000  # most component solutions kept in the component cache (least recently used go first)
+SAMPLER_BETA = 2.0  # cost (in log probability) of every missing or extra mine of a number while sampling
+SAMPLER_BATCH = 50  # valid samples per batch (confidence intervals come from the spread of the batch means)
+SAMPLER_MIN_BATCHES = 5  # batches before sampling is allowed to stop early
+SAMPLER_TOLERANCE = 0.02  # sampling stops once every confidence interval is narrower than this
+SAMPLER_BUDGET = 0.5  # seconds of sampling when no deadline is given
+CONFIDENCE_Z = 1.96  # z score of the confidence intervals (95%)
+GUESS_SLACK = 0.03  # how much riskier than the safest tile a guess candidate can be
+GUESS_CANDIDATES = 8  # most frontier (and interior) tiles getting a lookahead when guessing
+GUESS_MIN_OUTCOME = 0.05  # numbers less likely than this aren't looked ahead on
+GUESS_PROGRESS_WEIGHT = 0.2  # worth of a guess leading to certain moves, relative to surviving it
+GUESS_INFO_WEIGHT = 0.02  # worth of every bit of information the guessed tile's number gives
+ENDGAME_THRESHOLD = 24  # most unrevealed tiles for the endgame solver to take over
+ENDGAME_CONFIGURATIONS = 5000  # most global configurations the endgame solver searches over
+ENDGAME_NODES = 5000  # most positions the endgame guess search visits before falling back to probabilities
+ZOBRIST_SEED = 0x5EED  # seed of the zobrist keys (fixed, so position hashes are the same across runs)
+TABLE_MEMORY = 32 * 2**20  # memory cap of the transposition table in bytes
+TABLE_ENTRY_BYTES = 160  # memory an entry of the transposition table is assumed to take (slot, tuple, hash and a small value)
 Coord = tuple[int, int]  # custom type for type hinting
@@ -0,0 +1,256 @@
+""" Constraint solving over the frontier (the unrevealed tiles bordering revealed numbers), for when simple solving stagnates.
+Every revealed number with unrevealed neighbours is a constraint: those neighbours hold exactly its value minus its flags in mines.
+Tiles only interact through constraints they share, so the frontier is split into independent components and each
+component is enumerated on its own, the cost grows with the biggest component instead of with the whole frontier. """
+
+import numpy as np
+from disjoint_set import DisjointSet
+from component_cache import component_cache, canonical_form
+from anytime import Deadline, OutOfTime, CHECK_INTERVAL
+from constants import *
+
+
+Constraint = tuple[tuple[int, ...], int]  # (flat indices of unrevealed tiles, number of mines among them)
+
+
+class Component:
+    """ Independent piece of the frontier, its unrevealed tiles and the constraints that connect them. """
+
+    def __init__(self, cells: list[int], constraints: list[Constraint], cols: int = None):
+        self.cells = cells  # flat indices of the component's tiles (in enumeration order)
+        self.constraints = constraints  # constraints that only involve this component's tiles
+        self.cols = cols  # board width, to get the tiles' coords for the cache signature (no caching without it)
+        self.enumerated = False  # whether enumerate ran (components over the size limit get skipped)
+        self.totals = {}  # number of mines -> number of consistent mine assignments with that many mines
+        self.cell_totals = {}  # number of mines -> number of those assignments where each tile is a mine
+        self.signature = self.order = None  # canonical signature and tile order in the component cache (computed on lookup)
+
+    def __len__(self) -> int:
+        return len(self.cells)
+
+    @property
+    def solutions(self) -> int:
+        """ Number of consistent mine assignments (any number of mines). """
+        return sum(self.totals.values())
+
+    @property
+    def mine_counts(self) -> list[int]:
+        """ Number of solutions where each tile is a mine (any number of mines). """
+        return [sum(column) for column in zip(*self.cell_totals.values())] if self.cell_totals else [0] * len(self.cells)
+
+    def can_count(self, limit: int = COMPONENT_LIMIT) -> bool:
+        """ Returns whether the component is small enough to enumerate. """
+        return len(self.cells) <= limit
+
+    def weights(self) -> np.ndarray:
+        """ Returns the number of solutions by number of mines (index), scaled to the biggest. """
+        weights = np.zeros(max(self.totals) + 1)
+        for mines, count in self.totals.items():
+            weights[mines] = count
+        return weights / weights.max()
+
+    def marginals(self, rest: np.ndarray) -> list[float]:
+        """ Returns the probability of a mine on each tile when every solution with k mines is weighted by rest[k]
+        (the ways to place the other mines of the board around it). """
+        share, total = np.zeros(len(self.cells)), 0.0
+        for mines, count in self.totals.items():
+            share += rest[mines] * np.array(self.cell_totals[mines], dtype=float)
+            total += rest[mines] * count
+        return [0.0] * len(self.cells) if total == 0 else (share / total).tolist()
+
+    def enumerate(self, deadline: Deadline = None):
+        """ Counts the solutions, from the shared component cache if the same component (up to symmetry) was already
+        enumerated, else by backtracking and caching the counts for next time (unless the deadline cut it short). """
+        if self.signature is None and self.load_cached():  # (a signature means it was already looked up and missed)
+            return
+        self.backtrack(deadline)
+        if self.enumerated:
+            self.store_cached()
+
+    def load_cached(self) -> bool:
+        """ Takes the counts from the component cache if they're there, returns whether they were. """
+        if self.cols is None:  # no coords, no signature
+            return False
+        self.signature, self.order = canonical_form(self.cells, self.constraints, self.cols)
+        cached = component_cache.get(self.signature)
+        if cached is None:
+            return False
+
+        totals, cell_totals = cached
+        rank = {cell: i for i, cell in enumerate(self.order)}
+        self.totals = dict(totals)
+        self.cell_totals = {mines: [counts[rank[cell]] for cell in self.cells] for mines, counts in cell_totals.items()}
+        self.enumerated = True
+        return True
+
+    def store_cached(self):
+        """ Caches the counts (by canonical tile rank, so any symmetric copy of the component can use them). """
+        if self.cols is None:
+            return
+        if self.signature is None:
+            self.signature, self.order = canonical_form(self.cells, self.constraints, self.cols)
+        position = {cell: k for k, cell in enumerate(self.cells)}
+        component_cache.put(self.signature, dict(self.totals),
+                            {mines: [counts[position[cell]] for cell in self.order] for mines, counts in self.cell_totals.items()})
+
+    def backtrack(self, deadline: Deadline = None):
+        """ Enumerates every mine assignment consistent with the constraints (backtracking, one tile at a time),
+        counting the solutions and how many of them have a mine on each tile, by number of mines in the solution.
+        If the deadline passes first the counts are dropped and the component stays unenumerated. """
+        cells, constraints = self.cells, self.constraints
+        size = len(cells)
+        position = {cell: k for k, cell in enumerate(cells)}
+
+        # every constraint's mines still to place and tiles still unassigned
+        need = [mines for _, mines in constraints]
+        left = [len(members) for members, _ in constraints]
+        # constraints each tile is part of (by position)
+        touching = [[] for _ in range(size)]
+        for c, (members, _) in enumerate(constraints):
+            for cell in members:
+                touching[position[cell]].append(c)
+
+        assignment = [0] * size
+        totals, cell_totals = self.totals, self.cell_totals
+        calls = [0]  # placements tried, the deadline only gets checked every CHECK_INTERVAL of them
+
+        def place(k: int, mines: int):
+            if deadline is not None:
+                calls[0] += 1
+                if calls[0] % CHECK_INTERVAL == 0 and deadline.expired():
+                    raise OutOfTime
+            # every tile has been assigned without breaking a constraint, so it's a solution
+            if k == size:
+                totals[mines] = totals.get(mines, 0) + 1
+                counts = cell_totals.setdefault(mines, [0] * size)
+                for i in range(size):
+                    counts[i] += assignment[i]
+                return
+
+            # try tile k as safe then as a mine
+            for mine in (0, 1):
+                for c in touching[k]:
+                    need[c] -= mine
+                    left[c] -= 1
+                # prune if any constraint got too many mines, or can't get enough from its unassigned tiles
+                if all(0 <= need[c] <= left[c] for c in touching[k]):
+                    assignment[k] = mine
+                    place(k + 1, mines + mine)
+                # undo the assignment
+                for c in touching[k]:
+                    need[c] += mine
+                    left[c] += 1
+            assignment[k] = 0
+
+        try:
+            place(0, 0)
+        except OutOfTime:
+            self.totals, self.cell_totals = {}, {}
+            return
+        self.enumerated = True
+
+    def safe_cells(self) -> list[int]:
+        """ Returns the tiles that are safe in every solution. """
+        if self.solutions == 0:
+            return []
+        return [cell for cell, count in zip(self.cells, self.mine_counts) if count == 0]
+
+    def mine_cells(self) -> list[int]:
+        """ Returns the tiles that are a mine in every solution. """
+        solutions = self.solutions
+        if solutions == 0:
+            return []
+        return [cell for cell, count in zip(self.cells, self.mine_counts) if count == solutions]
+
+
+def frontier_constraints(board, numbers: set[int] = None, deadline: Deadline = None) -> list[Constraint]:
+    """ Returns the constraints of every revealed number bordering unrevealed tiles (flags count as mines).
+    The numbers to read them from can be passed in (the solver keeps them up to date), otherwise the whole board is scanned.
+    With a deadline the scan stops when it passes, the constraints found so far all hold, there just might be more. """
+    states, values = board.states, board.values
+    constraints = {}  # unrevealed tiles -> mines, so numbers seeing the exact same tiles only give one constraint
+
+    for step, index in enumerate(range(board.area) if numbers is None else sorted(numbers)):
+        if deadline is not None and step % CHECK_INTERVAL == CHECK_INTERVAL - 1 and deadline.expired():
+            break
+        # only revealed numbers (chain tiles) with unrevealed neighbours give constraints
+        if states[index] != REVEALED or not 0 < values[index] < MINE_VALUE or board.hidden[index] == 0:
+            continue
+
+        cells = tuple(adj for adj in board.adjacent_indices(index) if states[adj] == UNREVEALED)
+        constraints[cells] = values[index] - board.flags[index]
+
+    return list(constraints.items())
+
+def split_components(constraints: list[Constraint], cols: int = None) -> list[Component]:
+    """ Splits the frontier into independent components, tiles sharing a constraint end up in the same component.
+    The board width is needed for the components to use the component cache. """
+    # frontier tiles relabelled 0 to n-1, so the forest is as big as the frontier instead of the board
+    labels = {}
+    for cells, _ in constraints:
+        for cell in cells:
+            labels.setdefault(cell, len(labels))
+    forest = DisjointSet(len(labels))
+
+    # union the tiles of every constraint together
+    for cells, _ in constraints:
+        first = labels[cells[0]]
+        for cell in cells:
+            label = labels[cell]
+            if not forest.exists(label):
+                forest.new(label)
+            forest.union(first, label)
+
+    # group constraints by the representative of their tiles
+    grouped = {}
+    for constraint in constraints:
+        grouped.setdefault(forest.find(labels[constraint[0][0]]), []).append(constraint)
+
+    return [Component(order_cells(group), group, cols) for group in grouped.values()]
+
+def order_cells(constraints: list[Constraint]) -> list[int]:
+    """ Orders a component's tiles constraint by constraint (breadth first), so the tiles of a constraint
+    get assigned close together and the enumeration prunes as early as possible. The walk starts from the
+    far end of the component (the last constraint reached from the first one), so chains get walked end to end. """
+    # constraints every tile is part of
+    touching = {}
+    for c, (cells, _) in enumerate(constraints):
+        for cell in cells:
+            touching.setdefault(cell, []).append(c)
+
+    far_end = walk_constraints(constraints, touching, 0)[-1]
+    order, placed = [], set()
+    for c in walk_constraints(constraints, touching, far_end):
+        for cell in constraints[c][0]:
+            if cell not in placed:
+                order.append(cell)
+                placed.add(cell)
+
+    return order
+
+def walk_constraints(constraints: list[Constraint], touching: dict[int, list[int]], start: int) -> list[int]:
+    """ Returns the constraints in breadth first order from the start one, going through the tiles they share. """
+    queue, queued = [start], {start}  # constraint queue (plain list, read with a moving position)
+    for c in queue:
+        for cell in constraints[c][0]:
+            # queue the other constraints of the tile
+            for other in touching[cell]:
+                if other not in queued:
+                    queue.append(other)
+                    queued.add(other)
+    return queue
+
+def solve_components(components: list[Component], limit: int = COMPONENT_LIMIT) -> tuple[set[int], set[int]]:
+    """ Enumerates every component up to the size limit (bigger ones are skipped),
+    returns the tiles that are safe and the tiles that are mines in every solution. """
+    safe, mines = set(), set()
+
+    for component in components:
+        if not component.can_count(limit):  # too big to count
+            continue
+        if not component.enumerated:
+            component.enumerate()
+        safe.update(component.safe_cells())
+        mines.update(component.mine_cells())
+
+    return safe, mines
@@ -0,0 +1,170 @@
+""" Dynamic programming over a path decomposition of the frontier, for the long snaking chains lake scans leave behind.
+A chain can have hundreds of unrevealed tiles (way too many to enumerate) but it's thin: walking along it, only a handful of numbers
+are ever "open" (some of their tiles placed, some not) at the same time. So instead of whole assignments the DP only remembers,
+at every step along the chain, how many mines each open number has got so far. That's the separator state, and the number of
+states stays small while the chain gets long, so the number of steps is linear in the length of the chain instead of exponential.
+NOTE: every state carries the ways to get there by number of mines placed, a vector that grows by one each step, so the
+arithmetic is quadratic in the length (n^2 / 2 numbers per state over the whole chain). It's numpy work on short vectors
+next to the python work per step, so it only starts to show on chains of thousands of tiles. """
+
+import numpy as np
+from constraints import Component, Constraint
+from anytime import Deadline
+from constants import *
+
+
+class ChainComponent(Component):
+    """ Frontier component counted by dynamic programming along its tile order instead of enumerated.
+    Counts are kept as floats scaled step by step (only ratios are used), and which tiles are forced
+    is read from which states can actually be reached from both ends, so certain moves stay exact. """
+
+    def __init__(self, cells: list[int], constraints: list[Constraint], cols: int = None):
+        super().__init__(cells, constraints, cols)
+        position = {cell: k for k, cell in enumerate(cells)}
+        self.spots = [sorted(position[cell] for cell in members) for members, _ in constraints]  # positions of every constraint's tiles
+
+    def width(self) -> int:
+        """ Returns the most constraints open at once (the width of the decomposition), with one sweep over where they start and end. """
+        change = [0] * (len(self.cells) + 1)
+        for spots in self.spots:
+            change[spots[0] + 1] += 1  # open from the boundary after its first tile
+            change[spots[-1] + 1] -= 1  # up to the boundary of its last tile
+        width = open_count = 0
+        for step in change:
+            open_count += step
+            width = max(width, open_count)
+        return width
+
+    def plan(self):
+        """ Works out the open constraints at every boundary between tiles (the separators) and how each step updates them. """
+        constraints, size = self.constraints, len(self.cells)
+
+        # where every constraint starts and ends along the order, and how many of its tiles are still to come at each of them
+        first = [spots[0] for spots in self.spots]
+        last = [spots[-1] for spots in self.spots]
+        remaining = [{} for _ in range(size)]  # position -> {constraint: tiles of it after this position}
+        for c, spots in enumerate(self.spots):
+            for j, k in enumerate(spots):
+                remaining[k][c] = len(spots) - j - 1
+
+        # open constraints at every boundary b (between tile b-1 and tile b), in a fixed order
+        self.open = [[]]
+        for k in range(size):
+            starting = [c for c in remaining[k] if first[c] == k]
+            self.open.append([c for c in self.open[k] + starting if last[c] > k])
+
+        # step k: for every open constraint after the tile, where its sum comes from (-1 when it starts at this tile)
+        self.steps = []
+        for k in range(size):
+            slot = {c: i for i, c in enumerate(self.open[k])}
+            sources = [(slot.get(c, -1), c in remaining[k]) for c in self.open[k + 1]]
+            checks = [(slot.get(c, -1), constraints[c][1], left) for c, left in remaining[k].items()]
+            self.steps.append((sources, checks))
+
+    def can_count(self, limit: int = COMPONENT_LIMIT) -> bool:
+        """ Chains are counted by the DP whatever their length. """
+        return True
+
+    def enumerate(self, deadline: Deadline = None):
+        """ Counts the solutions by number of mines with a forward pass over the separator states,
+        then walks back to keep only the transitions that lead to a full solution.
+        Step k costs the number of states times k (the mine count vectors), so the pass is quadratic in the length.
+        If the deadline passes during the forward pass the component stays unenumerated. """
+        self.plan()
+        size = len(self.cells)
+        forward = [{(): np.ones(1)}]  # forward[k][state]: scaled number of ways to place tiles before k by number of mines
+        self.transitions = []  # transitions[k]: (state before tile k, tile k's value, state after)
+
+        for k in range(size):
+            if deadline is not None and deadline.expired():
+                return
+            sources, checks = self.steps[k]
+            layer, moves = {}, []
+            for state, ways in forward[k].items():
+                for mine in (0, 1):
+                    # every constraint of this tile must still be able to reach its number exactly
+                    if not all(0 <= mines - ((state[i] if i >= 0 else 0) + mine) <= left for i, mines, left in checks):
+                        continue
+                    after = tuple((state[i] if i >= 0 else 0) + (mine if touched else 0) for i, touched in sources)
+                    shifted = np.concatenate(([0.0], ways)) if mine else np.concatenate((ways, [0.0]))
+                    layer[after] = layer[after] + shifted if after in layer else shifted
+                    moves.append((state, mine, after))
+
+            # rescale the layer (only ratios matter), so long chains never overflow
+            top = max((ways.max() for ways in layer.values()), default=0.0)
+            forward.append({state: ways / top for state, ways in layer.items()} if top > 0 else layer)
+            self.transitions.append(moves)
+
+        self.forward = forward
+        self.prune()
+        final = forward[size].get(())
+        self.totals = {} if final is None or size == 0 else {mines: count for mines, count in enumerate(final) if count > 0}
+        self.enumerated = True
+
+    def prune(self):
+        """ Walks back from the end keeping only the transitions into states that can still finish a solution,
+        and records which values every tile can actually take (exact, no floats involved). """
+        size = len(self.cells)
+        alive = {()} if () in self.forward[size] else set()
+        self.possible = [set() for _ in range(size)]
+        for k in reversed(range(size)):
+            self.transitions[k] = [move for move in self.transitions[k] if move[2] in alive]
+            alive = {state for state, _, _ in self.transitions[k]}
+            self.possible[k] = {mine for _, mine, _ in self.transitions[k]}
+
+    @property
+    def solutions(self) -> int:
+        """ Whether there's any solution at all (the DP doesn't keep exact counts, only scaled ones). """
+        return int(len(self.totals) > 0)
+
+    def weights(self) -> np.ndarray:
+        """ Returns the scaled number of solutions by number of mines (index). """
+        weights = np.array(self.forward[-1][()]) if self.totals else np.zeros(1)
+        return weights / weights.max() if weights.max() > 0 else weights
+
+    def safe_cells(self) -> list[int]:
+        """ Returns the tiles that are safe in every solution. """
+        return [cell for cell, values in zip(self.cells, self.possible) if values == {0}]
+
+    def mine_cells(self) -> list[int]:
+        """ Returns the tiles that are a mine in every solution. """
+        return [cell for cell, values in zip(self.cells, self.possible) if values == {1}]
+
+    def marginals(self, rest: np.ndarray) -> list[float]:
+        """ Returns the probability of a mine on each tile when every solution with k mines is weighted by rest[k].
+        Backward pass: backward[state][a] is the weighted number of ways to finish the chain with a mines placed so far,
+        so each tile's probability is just forward times backward over its transitions (no per mine count bookkeeping). """
+        size = len(self.cells)
+        rest = np.concatenate((rest, np.zeros(max(0, size + 1 - len(rest)))))[:size + 1]
+        backward = {(): rest}
+        probabilities = [0.0] * size
+
+        for k in reversed(range(size)):
+            layer = {}
+            mine_ways = total_ways = 0.0
+            for state, mine, after in self.transitions[k]:
+                finish = backward[after][mine:mine + k + 1]  # indexed by the mines placed before tile k
+                ways = float(self.forward[k][state] @ finish)
+                total_ways += ways
+                if mine:
+                    mine_ways += ways
+                layer[state] = layer[state] + finish if state in layer else finish.copy()
+            probabilities[k] = mine_ways / total_ways if total_ways > 0 else 0.0
+
+            # rescale the layer, each tile's probability only compares ways within the same layer
+            top = max((finish.max() for finish in layer.values()), default=0.0)
+            backward = {state: finish / top for state, finish in layer.items()} if top > 0 else layer
+
+        return probabilities
+
+
+def decompose(components: list[Component], limit: int = COMPONENT_LIMIT, width_limit: int = CHAIN_WIDTH_LIMIT) -> list[Component]:
+    """ Swaps the components too big to enumerate for chain components when their decomposition is thin enough for the DP. """
+    decomposed = []
+    for component in components:
+        if not component.can_count(limit):
+            chain = ChainComponent(component.cells, component.constraints, component.cols)
+            if chain.width() <= width_limit:
+                component = chain
+        decomposed.append(component)
+    return decomposed
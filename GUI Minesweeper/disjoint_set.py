@@ -1,77 +1,70 @@
-from gui_game import Node  # for type hinting only
+from array import array
 
 
 class DisjointSet:
-    """ Disjoint-set data structure implemented with union by rank and path compression.
-        The nodes in this case are tuples containing row & column coordinates. """
+    """ Disjoint-set data structure implemented with union by size and path halving.
+        The nodes in this case are flat indices (row * cols + col), from 0 to the given size.
+        Everything lives in flat arrays allocated once, and find is iterative, so no recursion limit on long chains. """
 
-    def __init__(self):
-        self.parent = {}  # keeps track of every node's parent node
-        self.rank = {}  # keeps track of every node's rank
+    def __init__(self, size: int):
+        self.parent = array('l', range(size))  # keeps track of every node's parent node
+        self.sizes = array('l', [1]) * size  # keeps track of the size of every disjoint-set (by representative)
+        self.members = bytearray(size)  # keeps track of which nodes were added to the forest
         self.representatives = set()  # keeps track of the representatives in the forest
-        # self.sizes = {}  # keeps track of the size of every disjoint-set (by representative)
         self.count = 0  # keeps track of the number of disjoint-sets in the forest
 
     def forest_size(self) -> int:
         """ Returns the number of disjoint-sets in the forest. """
         return self.count
 
-    def exists(self, node: Node) -> bool:
+    def exists(self, node: int) -> bool:
         """ Returns whether given node exists in the forest. """
-        return node in self.parent
+        return self.members[node] == 1
 
-    def is_representative(self, node: Node) -> bool:
+    def is_representative(self, node: int) -> bool:
         """ Returns whether given node is a disjoint-set representative. """
         return node in self.representatives
 
-    def get_representatives(self) -> set[Node]:
+    def get_representatives(self) -> set[int]:
         """ Returns all the representatives in the disjoint-set forest. """
         return self.representatives
 
-    def new(self, node: Node):
+    def new(self, node: int):
         """ Adds a new node by creating a disjoint-set containing the new node and adding it to the forest. """
-        self.parent[node] = node  # sets node's parent to itself (representative)
-        self.rank[node] = 0  # initialize node's rank at 0
+        self.members[node] = 1  # node is now part of the forest (its parent is already itself)
         self.representatives.add(node)  # new node starts as the representative
-        # self.sizes[node] = 1  #  initializes the new disjoint-set's size as 1
         self.count += 1  # increment count of disjoint-sets in the forest
 
-    # path compression
-    def find(self, node: Node) -> Node:
+    # path halving
+    def find(self, node: int) -> int:
         """ Find and return the representative of the given node's disjoint set. """
-        # follow parent pointer until you reach the representative of the set
-        if self.parent[node] != node:
-            # sets the node's parent to the representative, compressing the path
-            self.parent[node] = self.find(self.parent[node])
-        return self.parent[node]
+        parent = self.parent
+        # follow parent pointers until you reach the representative of the set
+        while parent[node] != node:
+            # point the node to its grandparent as you go, halving the path (no recursion, no allocations)
+            parent[node] = parent[parent[node]]
+            node = parent[node]
+        return node
 
-    # union by rank
-    def union(self, nodeA: Node, nodeB: Node) -> bool:
+    def size(self, node: int) -> int:
+        """ Returns the number of nodes in the given node's disjoint-set. """
+        return self.sizes[self.find(node)]
+
+    # union by size
+    def union(self, nodeA: int, nodeB: int) -> bool:
         """ Performs union on the disjoint-sets of the given nodes and returns whether the union was successful. """
         reprA, reprB = self.find(nodeA), self.find(nodeB)  # gets each node's representative
 
         # if they're the same representative then they're already part of the same disjoint-set
         if reprA == reprB:
             return False  # union was unsuccessful
-        # merge into A's disjoint-set because it has higher rank
-        elif self.rank[reprA] > self.rank[reprB]:
-            self.parent[reprB] = reprA  # B.parent -> A
-            self.representatives.remove(reprB)  # B loses representative status
-            # self.sizes[reprA] += self.sizes[reprB]  # combine B's size to A
-            # self.sizes.pop(reprB)  # remove B's size because it's no longer a representative
-        # merge into B's disjoint-set because it has higher rank
-        elif self.rank[reprB] > self.rank[reprA]:
-            self.parent[reprA] = reprB # A.parent -> B
-            self.representatives.remove(reprA)  # A loses representative status
-            # self.sizes[reprB] += self.sizes[reprA]  # combine A's size to B
-            # self.sizes.pop(reprA)  # remove B's size because it's no longer a representative
-        # if they have equal rank, merge into A's disjoint-set and increase its rank
-        else:
-            self.parent[reprB] = reprA  # B.parent -> A
-            self.representatives.remove(reprB)  # B loses representative status
-            self.rank[reprA] += 1
-            # self.sizes[reprA] += self.sizes[reprB]  # combine B's size to A
-            # self.sizes.pop(reprB)  # remove B's size because it's no longer a representative
+
+        # always merge the smaller disjoint-set into the bigger one (A), so trees stay shallow
+        if self.sizes[reprA] < self.sizes[reprB]:
+            reprA, reprB = reprB, reprA
+        self.parent[reprB] = reprA  # B.parent -> A
+        self.representatives.remove(reprB)  # B loses representative status
+        self.sizes[reprA] += self.sizes[reprB]  # combine B's size to A
 
         self.count -= 1  # decrement the number of disjoint-sets
         return True  # union was successful
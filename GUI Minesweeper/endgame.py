@@ -0,0 +1,222 @@
+""" Exact endgame solving, for when only a few unrevealed tiles are left. With so few tiles every global configuration
+(every placement of exactly the mines left that satisfies every number) can be listed, so the mine count settles
+what local rules can't: a tile that's safe in every configuration is safe, even if no single number says so.
+When nothing is certain, the guess that maximises the chance of winning the game (not just of surviving the next click)
+is found by searching over what every guess could show: a guess splits the configurations by the number revealed,
+and the game is won from a set of configurations once a single one is left. Every configuration is equally likely
+(mines are placed uniformly), so probabilities are just counts.
+Sets of configurations reached through different guess orders are memoised, guesses that split the configurations the
+same way as one already tried are skipped (symmetric tiles), and guesses that can't beat the best one so far are cut. """
+
+from anytime import Deadline, CHECK_INTERVAL
+from zobrist import TranspositionTable
+from constants import *
+
+
+ENDGAME_SALT = 0xE4D6  # mixed into the position hash for endgame entries
+
+
+class SearchLimit(Exception):
+    """ Raised inside the search to unwind it when it runs out of nodes or time. """
+
+
+class EndgameSolver:
+    """ Lists the global configurations of the unrevealed tiles and searches for forced moves and the best guess. """
+
+    def __init__(self, board, table: TranspositionTable = None, configuration_limit: int = ENDGAME_CONFIGURATIONS, node_limit: int = ENDGAME_NODES, tile_limit: int = ENDGAME_THRESHOLD):
+        self.board = board
+        self.table = table if table is not None else TranspositionTable()
+        self.tile_limit = tile_limit  # most unrevealed tiles to take the position on, more and it's left to the other stages
+        self.configuration_limit = configuration_limit  # most configurations to search over, more and the position is left to probabilities
+        self.node_limit = node_limit  # most positions the guess search visits before giving up
+
+    # === CONFIGURATIONS ===
+    def configurations(self, cells: list[int], limit: int = None, deadline: Deadline = None) -> list[int] or None:
+        """ Returns every configuration of the tiles as a bitmask (bit k set: cells[k] is a mine),
+        or None if there are more than the limit (the solver's configuration limit by default) or the deadline passes first.
+        Backtracking over the tiles in order (frontier tiles first prune best). """
+        limit = self.configuration_limit if limit is None else limit
+        board = self.board
+        states, values = board.states, board.values
+        position = {cell: k for k, cell in enumerate(cells)}
+        mines_left = board.mine_count - states.count(FLAGGED)
+
+        # constraints of the revealed numbers around the tiles: mines still to place and tiles still unassigned
+        numbers = {number for cell in cells for number in board.adjacent_indices(cell)
+                   if states[number] == REVEALED and 0 < values[number] < MINE_VALUE}
+        need, left, touching = [], [], [[] for _ in cells]
+        for c, number in enumerate(numbers):
+            members = [position[adj] for adj in board.adjacent_indices(number) if adj in position]
+            need.append(values[number] - board.flags[number])
+            left.append(len(members))
+            for k in members:
+                touching[k].append(c)
+
+        size, found = len(cells), []
+        calls = [0]  # placements tried, the deadline only gets checked every CHECK_INTERVAL of them
+
+        def place(k: int, mask: int, mines: int):
+            if len(found) > limit:
+                return
+            if deadline is not None:
+                calls[0] += 1
+                if calls[0] % CHECK_INTERVAL == 0 and deadline.expired():
+                    raise SearchLimit
+            # every tile assigned, it's a configuration if it used exactly the mines left
+            if k == size:
+                if mines == mines_left:
+                    found.append(mask)
+                return
+            # not enough tiles left for the mines left
+            if mines_left - mines > size - k:
+                return
+
+            for mine in (0, 1):
+                if mines + mine > mines_left:
+                    continue
+                for c in touching[k]:
+                    need[c] -= mine
+                    left[c] -= 1
+                if all(0 <= need[c] <= left[c] for c in touching[k]):
+                    place(k + 1, mask | (mine << k), mines + mine)
+                for c in touching[k]:
+                    need[c] += mine
+                    left[c] += 1
+
+        try:
+            place(0, 0, 0)
+        except SearchLimit:
+            return None
+        return found if len(found) <= limit else None
+
+    # === SEARCH ===
+    def solve(self, deadline: Deadline = None) -> tuple[list[int], set[int], set[int], int or None, float, float] or None:
+        """ Returns (tiles, safe tiles, mine tiles, best guess, its probability of being a mine, chance of winning with it)
+        for the current position,
+        or None when there are too many unrevealed tiles or configurations or the search runs out of nodes or time.
+        The guess is None when there are certain moves (play those first) or when the game is already decided. """
+        board = self.board
+        states = board.states
+        count = states.count(UNREVEALED)  # counted at C speed, the tiles only get listed once there are few enough
+        if count > self.tile_limit:
+            return None
+        key = board.position_hash ^ ENDGAME_SALT
+        cached = self.table.get(key, count)
+        if cached is not None:
+            return cached
+
+        cells, index = [], states.find(UNREVEALED)
+        while index != -1:
+            cells.append(index)
+            index = states.find(UNREVEALED, index + 1)
+
+        cells = self.ordered_cells(cells)  # frontier first, the constraints prune them early and the interior just fills in the mines left
+        configurations = self.configurations(cells, deadline=deadline)
+        if configurations is None or len(configurations) == 0:  # too many or out of time, or the flags contradict the numbers
+            return None
+
+        # tiles that are the same in every configuration are certain
+        every, some = ~0, 0
+        for mask in configurations:
+            every &= mask
+            some |= mask
+        safe = {cell for k, cell in enumerate(cells) if not some >> k & 1}
+        mines = {cell for k, cell in enumerate(cells) if every >> k & 1}
+
+        guess, probability, chance = None, 0.0, 1.0
+        if len(safe) + len(mines) == 0:
+            self.prepare(cells)
+            self.memo, self.nodes, self.deadline = {}, 0, deadline
+            try:
+                chance, k = self.best_guess(frozenset(configurations))
+            except SearchLimit:
+                return None
+            if k is not None:
+                guess = cells[k]
+                probability = sum(mask >> k & 1 for mask in configurations) / len(configurations)
+
+        result = (cells, safe, mines, guess, probability, chance)
+        self.table.put(key, result, count)
+        return result
+
+    def ordered_cells(self, cells: list[int]) -> list[int]:
+        """ Returns the tiles with the frontier tiles (next to a revealed number) first. """
+        states, values = self.board.states, self.board.values
+        return sorted(cells, key=lambda cell: not any(states[adj] == REVEALED and 0 < values[adj] < MINE_VALUE
+                                                       for adj in self.board.adjacent_indices(cell)))
+
+    def prepare(self, cells: list[int]):
+        """ Works out the bitmask of every tile's unrevealed neighbours, to read the number it'd show in a configuration
+        (its flags add the same to every configuration, so they don't change how the configurations split). """
+        board = self.board
+        position = {cell: k for k, cell in enumerate(cells)}
+        self.size = len(cells)
+        self.neighbours = [sum(1 << position[adj] for adj in board.adjacent_indices(cell) if adj in position) for cell in cells]
+
+    def split(self, configurations: frozenset[int], k: int) -> dict[int, frozenset[int]]:
+        """ Splits the configurations where tile k is safe by the number tile k would show. """
+        neighbours, parts = self.neighbours[k], {}
+        for mask in configurations:
+            if not mask >> k & 1:
+                parts.setdefault(bin(mask & neighbours).count('1'), []).append(mask)
+        return {value: frozenset(part) for value, part in parts.items()}
+
+    def win_chance(self, configurations: frozenset[int]) -> float:
+        """ Returns the chance of winning from the configurations, playing every free reveal and then the best guesses. """
+        if len(configurations) == 1:  # everything is known
+            return 1.0
+        cached = self.memo.get(configurations)
+        if cached is not None:
+            return cached
+
+        self.nodes += 1
+        if self.nodes > self.node_limit or (self.deadline is not None and self.nodes % 64 == 0 and self.deadline.expired()):
+            raise SearchLimit
+
+        # tiles safe in every configuration are free to reveal, their numbers split the configurations for free
+        some = 0
+        for mask in configurations:
+            some |= mask
+        for k in range(self.size):
+            if some >> k & 1:
+                continue
+            parts = self.split(configurations, k)
+            if len(parts) > 1:
+                total = len(configurations)
+                chance = sum(len(part) / total * self.win_chance(part) for part in parts.values())
+                self.memo[configurations] = chance
+                return chance
+
+        chance, _ = self.best_guess(configurations)
+        self.memo[configurations] = chance
+        return chance
+
+    def best_guess(self, configurations: frozenset[int]) -> tuple[float, int or None]:
+        """ Returns the best chance of winning by guessing a tile, and the tile (by position). """
+        total = len(configurations)
+        if total == 1:
+            return 1.0, None
+        every, some = ~0, 0
+        for mask in configurations:
+            every &= mask
+            some |= mask
+
+        # candidates are the undecided tiles, safest first so the bound cuts as early as possible
+        safe_counts = [(sum(1 for mask in configurations if not mask >> k & 1), k) for k in range(self.size)
+                       if some >> k & 1 and not every >> k & 1]
+        safe_counts.sort(reverse=True)
+
+        best, best_k, seen = -1.0, None, set()
+        for safe_count, k in safe_counts:
+            if safe_count / total <= best:  # surviving the guess is an upper bound of winning with it
+                break
+            parts = self.split(configurations, k)
+            signature = frozenset(parts.values())
+            if signature in seen:  # same split as a tile already tried (symmetric tiles)
+                continue
+            seen.add(signature)
+            chance = sum(len(part) / total * self.win_chance(part) for part in parts.values())
+            if chance > best:
+                best, best_k = chance, k
+
+        return best, best_k
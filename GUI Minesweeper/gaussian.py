@@ -0,0 +1,98 @@
+""" Linear algebra deductions over the frontier, for big connected frontiers that the pattern pass can't break and that are too big to enumerate.
+Every component becomes a 0/1 coefficient matrix (one row per revealed number, one column per unrevealed tile, augmented with the
+number's mines left) and gets row reduced. A reduced row can force its tiles when its right hand side hits one of the bounds the
+row can reach with 0/1 tiles: at the max every positive tile is a mine and every negative one is safe, at the min the other way around. """
+
+import numpy as np
+from constraints import Component, Constraint
+from anytime import Deadline, OutOfTime
+
+
+EPSILON = 1e-9  # tolerance of the float row reduction (the coefficients stay small fractions)
+
+
+def row_reduce(matrix: np.ndarray, deadline: Deadline = None) -> np.ndarray:
+    """ Row reduces the augmented matrix (last column is the right hand side) to reduced row echelon form,
+    with partial pivoting, and returns its nonzero rows. Raises OutOfTime if the deadline passes first. """
+    """ NOTE: the deadline is checked once per column, every column already costs a whole pass over the matrix. """
+    matrix = matrix.astype(float)
+    rows, cols = matrix.shape
+    rank = 0
+
+    for col in range(cols - 1):
+        if rank == rows:
+            break
+        if deadline is not None and deadline.expired():
+            raise OutOfTime
+        # biggest pivot of the column among the rows left
+        pivot = rank + int(np.argmax(np.abs(matrix[rank:, col])))
+        if abs(matrix[pivot, col]) < EPSILON:  # nothing left in this column
+            continue
+
+        matrix[[rank, pivot]] = matrix[[pivot, rank]]  # swap pivot row up
+        matrix[rank] /= matrix[rank, col]
+        # clear the column from every other row at once
+        factors = matrix[:, col].copy()
+        factors[rank] = 0
+        matrix -= np.outer(factors, matrix[rank])
+        rank += 1
+
+    return matrix[:rank]
+
+def forced_tiles(constraints: list[Constraint], deadline: Deadline = None) -> tuple[set[int], set[int]]:
+    """ Builds the constraint matrix, row reduces it and returns the tiles found to be safe and the tiles found to be mines.
+    Raises OutOfTime if the deadline passes during the row reduction. """
+    cells = sorted({cell for members, _ in constraints for cell in members})
+    column = {cell: c for c, cell in enumerate(cells)}
+
+    # one row per constraint: 1 on every tile it sees, its mines on the right hand side
+    matrix = np.zeros((len(constraints), len(cells) + 1))
+    for r, (members, mines) in enumerate(constraints):
+        matrix[r, [column[cell] for cell in members]] = 1
+        matrix[r, -1] = mines
+
+    safe, mines = set(), set()
+    for row in row_reduce(matrix, deadline):
+        coefficients, total = row[:-1], row[-1]
+        positive, negative = coefficients > EPSILON, coefficients < -EPSILON
+        high, low = coefficients[positive].sum(), coefficients[negative].sum()  # bounds the row can reach with 0/1 tiles
+
+        if abs(total - high) < EPSILON:  # only reachable with every positive tile a mine and every negative tile safe
+            mines.update(cells[c] for c in np.flatnonzero(positive))
+            safe.update(cells[c] for c in np.flatnonzero(negative))
+        elif abs(total - low) < EPSILON:  # only reachable the other way around
+            safe.update(cells[c] for c in np.flatnonzero(positive))
+            mines.update(cells[c] for c in np.flatnonzero(negative))
+
+    return safe, mines
+
+
+class FrontierEliminator:
+    """ Runs the row reduction component by component, keeping every component's result between calls
+    so only components whose constraints changed since the last call (new reveals or flags) get reduced again. """
+
+    def __init__(self):
+        self.results = {}  # component constraints -> (safe tiles, mine tiles)
+
+    def deductions(self, components: list[Component], deadline: Deadline = None) -> tuple[set[int], set[int]]:
+        """ Returns the tiles found to be safe and the tiles found to be mines across all the components.
+        Once the deadline passes the components that would need reducing are skipped, the cached ones still count. """
+        safe, mines = set(), set()
+        results = {}  # only the components of the current frontier are kept for next time
+
+        for component in components:
+            key = frozenset(component.constraints)
+            result = self.results.get(key)
+            if result is None:  # new or changed component
+                if deadline is not None and deadline.expired():
+                    continue
+                try:
+                    result = forced_tiles(component.constraints, deadline)
+                except OutOfTime:  # a partial reduction proves nothing, so nothing gets cached
+                    continue
+            results[key] = result
+            safe |= result[0]
+            mines |= result[1]
+
+        self.results = results
+        return safe, mines
@@ -0,0 +1,132 @@
+""" Vectorised board generation with NumPy, builds the mine mask and the mine counts as whole arrays
+instead of going cell by cell. The Board fills its nodes from these arrays, which is what matters
+on huge boards where looping over every Node to count its neighbours dominates the run time. """
+
+import numpy as np
+from constants import ADJACENT_COORDS, Coord
+
+
+rng = np.random.default_rng()  # shared generator used when the caller doesn't provide one
+
+
+def derive_seeds(seed: int, game: int = 0) -> tuple[int, int]:
+    """ Derives the board seed and the solver seed of a game from a master seed and the game's number.
+    Uses NumPy's SeedSequence, so the streams of every game (and of the board vs the solver) are independent,
+    and game number N of a run can be regenerated exactly on its own without replaying games 0 to N-1. """
+    board, solver = np.random.SeedSequence(seed, spawn_key=(game,)).spawn(2)
+    return int(board.generate_state(1, np.uint64)[0]), int(solver.generate_state(1, np.uint64)[0])
+
+
+def generate_mine_mask(rows: int, cols: int, mine_spawn: float or int, generator: np.random.Generator = None, safe: Coord = None) -> np.ndarray:
+    """ Generates a boolean matrix of mines, by probability if mine spawn is under 1, else by mine count.
+    If a safe coord is given (first click), that tile and its 8 neighbours never get a mine, so it's always a zero. """
+    generator = rng if generator is None else generator
+    allowed = safe_mask(rows, cols, safe)  # tiles that are allowed to have a mine
+
+    # generate mine mask by probability (one vectorised draw for the whole board)
+    if mine_spawn < 1:
+        return (generator.random((rows, cols)) < mine_spawn) & allowed
+
+    # generate mine mask by mine count
+    mines = np.zeros(rows * cols, dtype=bool)  # flat so a mine is just one random index
+    excluded = np.flatnonzero(~allowed)  # flat indices of the safe tiles
+    mines[sample_indices(rows * cols, mine_spawn, generator, excluded)] = True
+
+    return mines.reshape(rows, cols)
+
+def sample_indices(area: int, count: int, generator: np.random.Generator = None, excluded: np.ndarray = ()) -> np.ndarray:
+    """ Samples count distinct flat indices out of range(area) without replacement, skipping the excluded indices.
+    Runs a partial Fisher-Yates shuffle over a virtual array of the allowed tiles, only the swapped positions are
+    stored (in a dict), so it takes time linear in the count at any density, no retrying already taken indices. """
+    generator = rng if generator is None else generator
+    size = area - len(excluded)  # number of indices that can be picked
+    if count > size:
+        raise ValueError(f'{count} mines don\'t fit in the {size} tiles that are allowed to have one')
+
+    # partial shuffle: position i swaps with a random position in [i, size), then position i is final
+    picks = generator.integers(np.arange(count), size).tolist()  # every swap's random position, drawn at once
+    swapped = {}  # position -> value, for the positions of the virtual array that don't hold their own value
+    sample = []
+    for i, j in enumerate(picks):
+        sample.append(swapped.get(j, j))
+        swapped[j] = swapped.get(i, i)
+
+    # the sample is ranks among the allowed tiles, shift every rank past the excluded indices at or below it
+    sample = np.array(sample, dtype=np.int64)
+    for index in np.sort(excluded):
+        sample[sample >= index] += 1
+
+    return sample
+
+def safe_mask(rows: int, cols: int, safe: Coord = None) -> np.ndarray:
+    """ Returns a boolean matrix of the tiles that can have a mine, everything except the safe coord and its neighbours. """
+    allowed = np.ones((rows, cols), dtype=bool)
+    if safe is not None:
+        r, c = safe
+        allowed[max(r-1, 0):r+2, max(c-1, 0):c+2] = False  # 3x3 block around the safe coord (clipped at the edges)
+    return allowed
+
+def count_adjacent_mines(mines: np.ndarray) -> np.ndarray:
+    """ Returns the number of adjacent mines of every tile, by summing the mine mask shifted in all 8 directions.
+    Works on a single (rows, cols) board or a whole stack of boards (..., rows, cols) at once. """
+    rows, cols = mines.shape[-2:]
+    # border of empty tiles so the shifts never go out of bounds (only around the board axes)
+    padded = np.pad(mines, [(0, 0)] * (mines.ndim - 2) + [(1, 1), (1, 1)]).astype(np.uint8)
+    counts = np.zeros(mines.shape, dtype=np.uint8)
+
+    # add the mask shifted by every adjacent offset, each shift lines a neighbour up with the tile
+    for dr, dc in ADJACENT_COORDS:
+        counts += padded[..., 1+dr:1+dr+rows, 1+dc:1+dc+cols]
+
+    return counts
+
+def generate_mine_arrays(rows: int, cols: int, mine_spawn: float or int, generator: np.random.Generator = None, safe: Coord = None) -> tuple[np.ndarray, np.ndarray]:
+    """ Generates a board as a pair of arrays: the mine mask and the adjacent mine counts. """
+    mines = generate_mine_mask(rows, cols, mine_spawn, generator, safe)
+    return mines, count_adjacent_mines(mines)
+
+def generate_boards(count: int, rows: int, cols: int, mine_spawn: float or int, generator: np.random.Generator = None, safe: Coord = None) -> tuple[np.ndarray, np.ndarray]:
+    """ Generates a batch of boards at once (for Monte Carlo runs), as a (count, rows, cols) mine tensor
+    and the matching (count, rows, cols) adjacent mine counts tensor. No Board or Node is created.
+    Mine spawn works the same as for a single board, and the safe coord (first click) is kept clear on every board.
+    NOTE: memory is a few bytes per tile of the whole batch, so generate millions of boards in chunks. """
+    generator = rng if generator is None else generator
+    allowed = safe_mask(rows, cols, safe)  # tiles that are allowed to have a mine
+
+    # generate mines by probability (one vectorised draw for the whole batch)
+    if mine_spawn < 1:
+        mines = (generator.random((count, rows, cols)) < mine_spawn) & allowed
+
+    # generate mines by mine count, every board gets exactly mine_spawn mines
+    else:
+        candidates = np.flatnonzero(allowed)  # flat indices that can get a mine
+        if mine_spawn > len(candidates):
+            raise ValueError(f'{mine_spawn} mines don\'t fit in the {len(candidates)} tiles that are allowed to have one')
+        # the mine_spawn allowed tiles with the smallest random keys are a uniform sample without replacement
+        keys = generator.random((count, len(candidates)))
+        picked = np.argpartition(keys, mine_spawn - 1, axis=1)[:, :mine_spawn]
+        mines = np.zeros((count, rows * cols), dtype=bool)
+        mines[np.arange(count)[:, None], candidates[picked]] = True
+        mines = mines.reshape(count, rows, cols)
+
+    return mines, count_adjacent_mines(mines)
+
+def neighbour_table(rows: int, cols: int) -> tuple[bytearray, list[tuple[int, ...]]]:
+    """ Precomputes the neighbour table of the board, computed once per board so traversals never offset
+    and bounds check coords. Every tile gets a 1 byte shape (bitmask of which of its 8 neighbours are
+    in bounds), and the shape indexes a shared tuple of flat index offsets, so the adjacent flat indices
+    of tile i are just i + offset for each offset of its shape (only 9 shapes ever show up on a board). """
+    # in bounds mask of every tile's neighbour in each direction, in the order of ADJACENT_COORDS
+    inside = np.zeros((rows+2, cols+2), dtype=bool)
+    inside[1:-1, 1:-1] = True
+
+    # combine the 8 shifted masks into one bitmask per tile
+    shapes = np.zeros((rows, cols), dtype=np.uint8)
+    for bit, (dr, dc) in enumerate(ADJACENT_COORDS):
+        shapes |= inside[1+dr:1+dr+rows, 1+dc:1+dc+cols].astype(np.uint8) << bit
+
+    # flat index offset of every direction, then the offsets that each possible shape keeps
+    flat_offsets = [dr * cols + dc for dr, dc in ADJACENT_COORDS]
+    offsets = [tuple(offset for bit, offset in enumerate(flat_offsets) if shape >> bit & 1) for shape in range(256)]
+
+    return bytearray(shapes.tobytes()), offsets
@@ -0,0 +1,117 @@
+""" Guess selection, for when nothing on the board is certain. Picking the tile least likely to be a mine isn't always best:
+a tile that's slightly riskier but whose number is likely to unlock certain moves saves guesses later on.
+Candidates are the tiles close to the lowest probability, and each one gets a shallow lookahead: the number it could show
+(from its neighbours' probabilities), and for every likely number, whether the pattern pass would find certain tiles with it.
+Candidates are ranked by the chance of surviving times how much the reveal is expected to tell (progress and information). """
+
+import numpy as np
+from math import log2
+from patterns import pattern_deductions
+from zobrist import TranspositionTable
+from constants import *
+
+
+GUESS_SALT = 0x6E55  # mixed into the position hash for guess entries
+GUESS_DEPTH = 1  # depth of the lookahead, for the table's replacement policy
+
+
+def outcome_distribution(board, index: int, probabilities: dict[int, float], interior_probability: float) -> np.ndarray:
+    """ Returns the probability of every number (0 to 8) the tile could show if it's safe, treating its neighbours
+    as independent (each with its own mine probability, flags are certain mines). """
+    distribution = np.zeros(9)
+    distribution[0] = 1.0
+    states = board.states
+    for adj in board.adjacent_indices(index):
+        if states[adj] == FLAGGED:
+            distribution = np.roll(distribution, 1)
+        elif states[adj] == UNREVEALED:
+            p = probabilities.get(adj, interior_probability)
+            distribution = distribution * (1 - p) + np.roll(distribution, 1) * p
+    return distribution
+
+def entropy(distribution: np.ndarray) -> float:
+    """ Returns the entropy of a distribution in bits (how much seeing the outcome tells on average). """
+    return -sum(p * log2(p) for p in distribution if p > 0)
+
+
+class GuessPolicy:
+    """ Ranks guess candidates by safety and by what their reveal is expected to give, keeping the pick for every position
+    in a transposition table (keyed by the board's zobrist hash, so any move order reaching the position finds it). """
+
+    def __init__(self, table: TranspositionTable = None):
+        self.table = table if table is not None else TranspositionTable()
+
+    def choose(self, board, constraints: list, probabilities: dict[int, float], interior_probability: float, frontier: set[int]) -> tuple[int or None, float]:
+        """ Returns the tile to guess and its probability of being a mine (None if nothing is left to guess),
+        the same position always gets the same guess without redoing the lookahead. """
+        key = board.position_hash ^ GUESS_SALT  # (salted, the table is shared with other kinds of entries)
+        cached = self.table.get(key, GUESS_DEPTH)
+        if cached is not None:
+            return cached
+
+        candidates = self.candidates(board, probabilities, interior_probability, frontier)
+        best, best_probability, best_score = None, 1.0, -1.0
+        for index, probability in candidates:
+            score = (1 - probability) * (1 + self.lookahead(board, index, constraints, probabilities, interior_probability))
+            if score > best_score:
+                best, best_probability, best_score = index, probability, score
+
+        self.table.put(key, (best, best_probability), GUESS_DEPTH)
+        return best, best_probability
+
+    def candidates(self, board, probabilities: dict[int, float], interior_probability: float, frontier: set[int]) -> list[tuple[int, float]]:
+        """ Returns the tiles worth a lookahead: the safest frontier tiles and, if the interior is about as safe,
+        a few interior tiles (corners and edges first, fewer neighbours make a useful number more likely). """
+        interior = self.interior_candidates(board, frontier)
+        lowest = min(min(probabilities.values(), default=1.0), interior_probability if len(interior) > 0 else 1.0)
+        cutoff = lowest + GUESS_SLACK
+
+        candidates = sorted(((index, p) for index, p in probabilities.items() if p <= cutoff), key=lambda candidate: candidate[1])
+        candidates = candidates[:GUESS_CANDIDATES]
+        if interior_probability <= cutoff:
+            candidates.extend((index, interior_probability) for index in interior)
+        return candidates
+
+    def interior_candidates(self, board, frontier: set[int]) -> list[int]:
+        """ Returns up to GUESS_CANDIDATES unrevealed tiles off the frontier, corners first, then edges, then any others.
+        Only the board's outline is walked, the rest is searched in the states with bytearray.find (never every tile in python). """
+        states, rows, cols = board.states, board.rows, board.cols
+        corners = sorted({0, cols - 1, (rows - 1) * cols, board.area - 1})
+        edges = sorted({*range(1, cols - 1), *range((rows - 1) * cols + 1, board.area - 1),
+                        *range(cols, (rows - 1) * cols, cols), *range(2 * cols - 1, board.area - 1, cols)} - set(corners))
+
+        picked = []
+        for index in corners + edges:
+            if states[index] == UNREVEALED and index not in frontier and index not in picked:
+                picked.append(index)
+                if len(picked) == GUESS_CANDIDATES:
+                    return picked
+
+        index = -1
+        while len(picked) < GUESS_CANDIDATES:
+            index = states.find(UNREVEALED, index + 1)
+            if index == -1:
+                break
+            if index not in frontier and index not in picked:
+                picked.append(index)
+        return picked
+
+    def lookahead(self, board, index: int, constraints: list, probabilities: dict[int, float], interior_probability: float) -> float:
+        """ Returns how much revealing the tile is expected to give: the chance its number leads to certain moves
+        (checked for every likely number with the pattern pass over the constraints around it), plus its information. """
+        distribution = outcome_distribution(board, index, probabilities, interior_probability)
+        unrevealed = [adj for adj in board.adjacent_indices(index) if board.states[adj] == UNREVEALED]
+        flags = sum(board.states[adj] == FLAGGED for adj in board.adjacent_indices(index))
+        area = set(unrevealed) | {index}
+
+        # the tile is safe in every outcome, and the constraints around it are the only ones its number can change
+        nearby = [(tuple(cell for cell in members if cell != index), mines) for members, mines in constraints if not area.isdisjoint(members)]
+        progress = 0.0
+        for value, chance in enumerate(distribution):
+            if chance < GUESS_MIN_OUTCOME or len(unrevealed) == 0:
+                continue
+            safe, mines = pattern_deductions(nearby + [(tuple(unrevealed), value - flags)])
+            if len(safe) + len(mines) > 0:
+                progress += chance
+
+        return GUESS_PROGRESS_WEIGHT * progress + GUESS_INFO_WEIGHT * entropy(distribution)
@@ -15,8 +15,8 @@ class User(Solver):
     """ The same thing as subclassing from Minesweeper, except the Solver file is a middleman
     to add all the solver code in between, while still keeping the final input loop separate. """
 
-    def __init__(self, rows: int = ROWS, cols: int = COLS, mine_spawn: float or int = MINE_SPAWN, win_height: int = WIN_HEIGHT, win_title: str = WIN_TITLE):
-        super().__init__(rows, cols, mine_spawn, win_height, win_title)
+    def __init__(self, rows: int = ROWS, cols: int = COLS, mine_spawn: float or int = MINE_SPAWN, win_height: int = WIN_HEIGHT, win_title: str = WIN_TITLE, seed: int = None):
+        super().__init__(rows, cols, mine_spawn, win_height, win_title, seed=seed)
         pygame.event.set_blocked(pygame.MOUSEMOTION)
 
     # === MAIN ===
@@ -44,10 +44,7 @@ class User(Solver):
                 if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
                     # get position on window clicked and then get node at position
                     node = self.get_clicked_node()
-                    self.first_drop = node.get_coord()  # save this coord as the first drop coord
-
-                    self.generate_empty_drop(node)  # regen board until there's a zero under choice
-                    self.reveal(node)  # reveals spot once the 0 is found
+                    self.first_move(node)  # regens board until there's a zero under choice and reveals it
                     return
 
         pygame.quit()
@@ -74,9 +71,9 @@ class User(Solver):
                         node = self.get_clicked_node()
 
                         # sanitize input before trying to reveal
-                        if node.state == self.LAKE:  # do nothing
+                        if node.mark == LAKE:  # do nothing
                             pass
-                        elif self.is_revealed_solver(node) and not node.is_empty():  # chord node
+                        elif node.is_revealed() and not node.is_empty():  # chord node
                             # chord returns false if you incorrectly flagged
                             chord_result = self.chord(node)
                             # lose if chord is wrong (flags were wrong)
@@ -95,7 +92,7 @@ class User(Solver):
                             self.level_order_loss(node)
                         else:  # node is safe, reveal it
                             # avoids increasing revealed counter for already revealed by solver
-                            if node.state in self.revealed_states:
+                            if node.is_revealed():
                                 continue
                             else:
                                 self.reveal(node)
@@ -134,6 +131,8 @@ class User(Solver):
 
                         if self.is_win():
                             self.level_order_win(self.get_node(*self.first_drop))
+                        elif self.lost_node is not None:  # a guess hit a mine
+                            self.level_order_loss(self.lost_node)
 
                     # else, some other key was pressed
 
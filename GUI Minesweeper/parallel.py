@@ -0,0 +1,86 @@
+""" Enumerating big frontier components in parallel, across a process pool that's kept alive between moves.
+Components are independent by construction, so when the frontier splits into several big ones they can be counted at the same time.
+Components only cross the process boundary in a compact form: tiles relabelled 0..n-1 (their position in the component's order)
+and every constraint's tiles packed as 2 byte ints, so the workers never see the board and the counts come back in the component's order.
+Small components aren't worth the round trip, they're enumerated in this process while the workers count the big ones.
+With a deadline every task gets it too (as wall clock time, the same in every process) and gives up when it passes,
+so a worker never stays busy on a component nobody is waiting for anymore. """
+
+import os
+from time import time
+from array import array
+from concurrent.futures import ProcessPoolExecutor, wait
+from constraints import Component
+from anytime import Deadline
+from constants import *
+
+
+WORKERS = os.cpu_count() or 1  # processes in the pool
+PackedComponent = tuple[int, tuple[tuple[bytes, int], ...]]  # (number of tiles, constraints as (packed tile positions, mines))
+
+executor = None  # persistent pool, started on first use
+
+
+def get_executor() -> ProcessPoolExecutor:
+    """ Returns the process pool, starting it the first time (starting processes costs more than most enumerations). """
+    global executor
+    if executor is None:
+        executor = ProcessPoolExecutor(max_workers=WORKERS)
+    return executor
+
+def shutdown_pool():
+    """ Stops the pool's processes (it gets started again when needed). """
+    global executor
+    if executor is not None:
+        executor.shutdown()
+        executor = None
+
+
+def pack(component: Component) -> PackedComponent:
+    """ Returns the component in its compact form, tiles replaced by their position in the component's order. """
+    position = {cell: k for k, cell in enumerate(component.cells)}
+    return len(component.cells), tuple((array('H', [position[cell] for cell in members]).tobytes(), mines)
+                                       for members, mines in component.constraints)
+
+def count_packed(packed: PackedComponent, end: float = None) -> tuple[dict[int, int], dict[int, list[int]]] or None:
+    """ Enumerates a packed component (in a worker process), returns its counts by number of mines,
+    or None if the deadline (wall clock time, None for no deadline) passed first. """
+    size, constraints = packed
+    component = Component(list(range(size)), [(tuple(array('H', members)), mines) for members, mines in constraints])
+    component.backtrack(None if end is None else Deadline(max(0.0, end - time())))
+    return (component.totals, component.cell_totals) if component.enumerated else None
+
+
+def enumerate_components(components: list[Component], limit: int = COMPONENT_LIMIT, threshold: int = PARALLEL_THRESHOLD, deadline: Deadline = None):
+    """ Enumerates every component up to the size limit that wasn't already (chain components over the limit count themselves),
+    sending the big ones that aren't in the component cache to the pool when there's more than one of them to spread out.
+    With a deadline, components not finished (or not back from the pool) by then are left unenumerated. """
+    pending = [component for component in components if not component.enumerated and component.can_count(limit)]
+    big = [component for component in pending if threshold <= len(component) <= limit]
+    if WORKERS > 1 and len(big) > 1:
+        big = [component for component in big if not component.load_cached()]
+    if WORKERS < 2 or len(big) < 2:  # nothing to spread out, a single component only gets slower through the pool
+        big = []
+
+    # big ones go out first, the small ones get enumerated here while the workers are busy
+    end = None if deadline is None or deadline.end is None else time() + deadline.remaining()
+    futures = [get_executor().submit(count_packed, pack(component), end) for component in big]
+    sent = set(big)
+    for component in pending:
+        if deadline is not None and deadline.expired():
+            break
+        if not component.enumerated and component not in sent:
+            component.enumerate(deadline)
+
+    # merge the counts back in, of the ones done in time
+    if len(futures) > 0:
+        wait(futures, timeout=deadline.remaining() if deadline is not None else None)
+    for component, future in zip(big, futures):
+        if not future.done():
+            future.cancel()  # (a worker that already started gives up at the deadline on its own)
+            continue
+        if future.result() is None:  # ran out of time in the worker
+            continue
+        component.totals, component.cell_totals = future.result()
+        component.enumerated = True
+        component.store_cached()
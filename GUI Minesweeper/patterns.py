@@ -0,0 +1,61 @@
+""" Pairwise pattern deductions over the frontier constraints (the 1-1, 1-2 and 1-2-1 patterns), the cheap step before enumeration.
+Two numbers that see overlapping unrevealed tiles can be compared: whatever mines one of them is missing from the overlap
+have to be in its own tiles, so subtracting one constraint from the other gives tiles that are certain mines or certain safe.
+Constraints are indexed by the tiles they see, so only pairs that actually share a tile are ever compared. """
+
+from constraints import Constraint
+
+
+class ConstraintStore:
+    """ Frontier constraints indexed by tile, every tile maps to the constraints that see it. """
+
+    def __init__(self, constraints: list[Constraint]):
+        self.constraints = [(frozenset(cells), mines) for cells, mines in constraints]
+        self.index = {}  # tile -> ids of the constraints that see it
+        for c, (cells, _) in enumerate(self.constraints):
+            for cell in cells:
+                self.index.setdefault(cell, []).append(c)
+
+    def overlapping(self, c: int) -> set[int]:
+        """ Returns the ids of the other constraints sharing at least one tile with constraint c. """
+        neighbours = set()
+        for cell in self.constraints[c][0]:
+            neighbours.update(self.index[cell])
+        neighbours.discard(c)
+        return neighbours
+
+    def deductions(self) -> tuple[set[int], set[int]]:
+        """ Compares every overlapping pair of constraints and returns the tiles found to be safe and the tiles found to be mines. """
+        safe, mines = set(), set()
+
+        for a, (cells_a, mines_a) in enumerate(self.constraints):
+            # trivial constraints first: all mines or no mines
+            if mines_a == 0:
+                safe |= cells_a
+                continue
+            if mines_a == len(cells_a):
+                mines |= cells_a
+                continue
+
+            for b in self.overlapping(a):
+                cells_b, mines_b = self.constraints[b]
+                only_b = cells_b - cells_a  # tiles only b sees
+                if len(only_b) == 0:  # b is a subset of a, the pair is handled when a is b's neighbour
+                    continue
+                only_a = cells_a - cells_b  # tiles only a sees
+
+                # b has this many more mines than a, they can only come from b's own tiles (a can put at most all its mines in the overlap)
+                extra = mines_b - mines_a
+                if extra == len(only_b):
+                    mines |= only_b  # b's own tiles are all mines
+                    safe |= only_a  # a's mines are all in the overlap, so a's own tiles are safe
+                # a is a subset of b with the same number of mines, b's other tiles are all safe
+                elif extra == 0 and len(only_a) == 0:
+                    safe |= only_b
+
+        return safe, mines
+
+
+def pattern_deductions(constraints: list[Constraint]) -> tuple[set[int], set[int]]:
+    """ Returns the tiles found to be safe and the tiles found to be mines by comparing overlapping constraints. """
+    return ConstraintStore(constraints).deductions()
@@ -0,0 +1,129 @@
+""" Exact mine probabilities of the unrevealed tiles, for when there's no certain move left.
+A frontier solution with k mines leaves mines_left - k mines for the interior (unrevealed tiles off the frontier),
+which can be placed in C(interior, mines_left - k) ways, so solutions are weighted by that instead of counted equally.
+Components are combined by convolving their mine count distributions, and the binomials are kept in log space
+(scaled to the biggest one) so nothing overflows on huge boards. """
+
+from functools import lru_cache
+from math import isqrt
+from typing import Generator
+import numpy as np
+from constraints import Component, frontier_constraints, split_components
+from decomposition import decompose
+from parallel import enumerate_components
+from constants import *
+
+
+@lru_cache(maxsize=64)
+def log_binomials(n: int) -> np.ndarray:
+    """ Returns log C(n, k) for every k from 0 to n, cached since the interior size barely changes between moves. """
+    k = np.arange(1, n + 1)
+    # C(n, k) = C(n, k-1) * (n-k+1) / k, so the logs are a running sum
+    return np.concatenate(([0.0], np.cumsum(np.log(n - k + 1) - np.log(k))))
+
+def interior_weights(interior: int, mines: int, fewest: int = 0, most: int = None) -> np.ndarray:
+    """ Returns the number of ways to place s mines in the interior, C(interior, s) for every s from 0 to mines,
+    worked out in log space and scaled to the biggest before leaving it. Only s from fewest to most can happen
+    (the rest of the mines have to fit in the frontier), so only those are kept and scaled, otherwise on big boards
+    the impossible counts dwarf the possible ones and they'd all round down to zero. """
+    most = min(mines if most is None else most, interior)
+    logs = np.full(mines + 1, -np.inf)  # log(0) for the counts that can't happen
+    if fewest > most:
+        return np.zeros(mines + 1)
+    logs[fewest:most + 1] = log_binomials(interior)[fewest:most + 1]
+    return np.exp(logs - logs[fewest:most + 1].max())
+
+def meet(prefix: np.ndarray, suffix: np.ndarray, total: int) -> float:
+    """ Returns the sum of prefix[a] * suffix[total - a], the ways to place exactly total mines across both sides. """
+    if total < 0:
+        return 0.0
+    size = min(len(prefix), total + 1)
+    return float(prefix[:size] @ suffix[total::-1][:size])
+
+def normalize(vector: np.ndarray) -> np.ndarray:
+    """ Scales a vector to a max of 1 (only ratios matter), so long chains of convolutions never under or overflow. """
+    top = vector.max()
+    return vector / top if top > 0 else vector
+
+def suffixes_after(weights: list[np.ndarray], interior: np.ndarray) -> Generator[np.ndarray, None, None]:
+    """ Yields, for every component i in order, the ways to place s mines among the components after i plus the interior.
+    Only every sqrt(n)th suffix is kept from the backward pass and the ones in between are recomputed block by block,
+    so memory stays at about 2 sqrt(n) vectors instead of n (they're as long as the mines left, big on huge boards). """
+    count, length = len(weights), len(interior)
+    step = max(1, isqrt(count))
+
+    # backward pass, keeping checkpoints at multiples of step (and the interior alone at the end)
+    checkpoints = {count: interior}
+    suffix = interior
+    for i in reversed(range(1, count)):
+        suffix = normalize(np.convolve(suffix, weights[i])[:length])
+        if i % step == 0:
+            checkpoints[i] = suffix
+
+    # forward pass, recomputing each block's suffixes from the checkpoint at the end of the block
+    for start in range(0, count, step):
+        end = min(start + step, count)
+        block = [checkpoints[end]]
+        for i in reversed(range(start + 2, end + 1)):
+            block.append(normalize(np.convolve(block[-1], weights[i - 1])[:length]))
+        yield from reversed(block)
+
+def mine_probabilities(board, components: list[Component] = None, limit: int = COMPONENT_LIMIT) -> tuple[dict[int, float], float]:
+    """ Returns the probability that each frontier tile is a mine (flat index -> probability),
+    and the probability that any given interior tile is a mine. Flags are counted as mines.
+    Components that were already enumerated can be passed in, otherwise they get built and enumerated here.
+    NOTE: components over the size limit that are too wide to count along their chain are skipped, their tiles
+    are counted as interior tiles, so the probabilities are only exact when every component could be counted. """
+    if components is None:
+        components = decompose(split_components(frontier_constraints(board), board.cols), limit)
+    enumerate_components(components, limit)
+    solved = [component for component in components if component.enumerated and component.solutions > 0]
+
+    # interior tiles are every unrevealed tile outside the solved components
+    interior = board.states.count(UNREVEALED) - sum(len(component) for component in solved)
+    mines_left = board.mine_count - board.states.count(FLAGGED)
+    if mines_left < 0:
+        return {}, 0.0
+
+    weights = [component.weights() for component in solved]
+    # mines the frontier can hold, which bounds the mines left for the interior
+    fewest = sum(int(np.flatnonzero(w)[0]) for w in weights)
+    most = sum(len(w) - 1 for w in weights)
+    interior_ways = interior_weights(interior, mines_left, max(0, mines_left - most), mines_left - fewest)
+
+    probabilities = {}
+    prefix = np.ones(1)  # prefix[a]: ways to place a mines among the components before the current one
+    suffixes = suffixes_after(weights, interior_ways)
+    for component, w, after in zip(solved, weights, suffixes):
+        # weight of the component having k mines: its solutions times the ways to place everything else
+        rest = np.array([meet(prefix, after, mines_left - k) for k in range(len(w))])
+        probabilities.update(zip(component.cells, component.marginals(rest)))
+        prefix = normalize(np.convolve(prefix, w)[:mines_left + 1])
+
+    # interior probability: expected mines left for the interior over the number of interior tiles
+    if interior == 0:
+        return probabilities, 0.0
+    inside = interior_ways[::-1]  # inside[t]: ways to place the rest when the frontier has t mines
+    frontier = np.arange(len(prefix))
+    ways = prefix @ inside[:len(prefix)]
+    expected = prefix @ (inside[:len(prefix)] * (mines_left - frontier))
+    return probabilities, float(expected / ways / interior) if ways > 0 else 0.0
+
+def outside_weights(board, counted: list[Component], sampled: int) -> np.ndarray:
+    """ Returns, for every k from 0 to sampled, the ways to place the rest of the mines left when a set of sampled tiles holds k mines,
+    across the counted components and the interior (the unrevealed tiles in neither), scaled to the biggest (see sampling.py). """
+    solved = [component for component in counted if component.enumerated and component.solutions > 0]
+    interior = board.states.count(UNREVEALED) - sum(len(component) for component in solved) - sampled
+    mines_left = board.mine_count - board.states.count(FLAGGED)
+    if mines_left < 0:
+        return np.zeros(sampled + 1)
+
+    weights = [component.weights() for component in solved]
+    fewest = sum(int(np.flatnonzero(w)[0]) for w in weights)
+    most = sum(len(w) - 1 for w in weights)
+    interior_ways = interior_weights(interior, mines_left, max(0, mines_left - most - sampled), mines_left - fewest)
+
+    prefix = np.ones(1)  # ways to place a mines among the counted components
+    for w in weights:
+        prefix = normalize(np.convolve(prefix, w)[:mines_left + 1])
+    return normalize(np.array([meet(prefix, interior_ways, mines_left - k) for k in range(sampled + 1)]))
@@ -0,0 +1,184 @@
+""" Mine probability estimates by Markov chain Monte Carlo, for frontier components too big to count exactly (or to count in time).
+The chain walks over mine assignments of the component's tiles with single tile flips and swaps between tiles sharing a number,
+it's allowed through assignments that break numbers but they cost exp(-beta) per missing or extra mine, and only assignments
+that satisfy every number are recorded. Those come out weighted by the ways to place the rest of the mines left outside
+(the counted components plus the interior), same as the exact probabilities, so the global mine count is respected.
+Samples are grouped in batches, and the spread of the batch means gives every tile a confidence interval
+(batch means account for consecutive samples of the chain being correlated). """
+
+import random
+import numpy as np
+from math import exp, sqrt
+from anytime import Deadline
+from constraints import Component, Constraint
+from probability import outside_weights
+from constants import *
+
+
+class SampleEstimate:
+    """ Estimated mine probabilities of the sampled tiles, with their confidence intervals. """
+
+    __slots__ = ('probabilities', 'intervals', 'samples', 'separated')
+
+    def __init__(self, probabilities: dict[int, float], intervals: dict[int, tuple[float, float]], samples: int, separated: bool):
+        self.probabilities = probabilities  # flat index -> estimated probability of a mine
+        self.intervals = intervals  # flat index -> (low, high) confidence interval of the probability
+        self.samples = samples  # valid assignments recorded
+        self.separated = separated  # whether sampling stopped because the safest tile was clearly known
+
+    def safest(self) -> tuple[int or None, float]:
+        """ Returns the sampled tile least likely to be a mine and its estimated probability. """
+        if len(self.probabilities) == 0:
+            return None, 1.0
+        index = min(self.probabilities, key=self.probabilities.get)
+        return index, self.probabilities[index]
+
+
+class FrontierSampler:
+    """ Metropolis chain over the mine assignments of a set of frontier tiles. """
+
+    def __init__(self, cells: list[int], constraints: list[Constraint], weights: np.ndarray, rng: random.Random = None, start: list[int] = None, beta: float = SAMPLER_BETA):
+        self.cells = cells
+        self.rng = rng if rng is not None else random.Random()
+        self.beta = beta  # cost of every missing or extra mine of a number (higher stays closer to valid assignments)
+
+        # weights[k]: ways to place the other mines left when these tiles hold k mines. Mine counts the outside can't go with
+        # get a small weight instead of 0 (exp(-beta) per mine away from a possible count), the chain has to be able to pass
+        # through them, they're just never recorded
+        self.feasible = weights > 0
+        possible = np.flatnonzero(self.feasible)
+        if len(possible) > 0:
+            distance = np.abs(np.arange(len(weights))[:, None] - possible[None, :]).min(axis=1)
+            weights = np.where(self.feasible, weights, weights[possible].min() * np.exp(-beta * distance))
+        self.weights = weights
+        position = {cell: i for i, cell in enumerate(cells)}
+
+        # constraints by position, and the tiles each tile shares a number with (swap partners)
+        self.members = [[position[cell] for cell in members] for members, _ in constraints]
+        self.touching = [[] for _ in cells]
+        for c, members in enumerate(self.members):
+            for i in members:
+                self.touching[i].append(c)
+        self.partners = [sorted({j for c in touching for j in self.members[c] if j != i}) for i, touching in enumerate(self.touching)]
+
+        # start from a given assignment (a SAT model is a valid one), or from no mines at all
+        self.state = list(start) if start is not None else [0] * len(cells)
+        self.mines = sum(self.state)
+        self.need = [mines - sum(self.state[i] for i in self.members[c]) for c, (_, mines) in enumerate(constraints)]
+        self.energy = sum(abs(need) for need in self.need)  # total missing or extra mines over every number
+
+    def flip_cost(self, i: int) -> int:
+        """ Applies a flip of tile i to the numbers' needs and returns the change of energy. """
+        change = 1 - 2 * self.state[i]  # +1 places a mine, -1 removes it
+        need, delta = self.need, 0
+        for c in self.touching[i]:
+            delta += abs(need[c] - change) - abs(need[c])
+            need[c] -= change
+        self.state[i] ^= 1
+        return delta
+
+    def step(self):
+        """ Proposes a flip or a swap and accepts it with the Metropolis-Hastings probability. """
+        rng, state = self.rng, self.state
+        i = rng.randrange(len(state))
+
+        if rng.random() < 0.5 or len(self.partners[i]) == 0:
+            # flip: changes the mines held by these tiles, so the outside weights come in
+            mines = self.mines + 1 - 2 * state[i]
+            delta = self.flip_cost(i)
+            ratio = exp(-self.beta * delta) * self.weights[mines] / self.weights[self.mines]
+            if ratio >= 1 or rng.random() < ratio:
+                self.mines, self.energy = mines, self.energy + delta
+            else:
+                self.flip_cost(i)  # undo
+            return
+
+        # swap: moves a mine between two tiles sharing a number (same number of mines)
+        partners = self.partners[i]
+        j = partners[rng.randrange(len(partners))]
+        if state[i] == state[j]:
+            return
+        delta = self.flip_cost(i) + self.flip_cost(j)
+        ratio = exp(-self.beta * delta) * len(partners) / len(self.partners[j])  # (Hastings correction, partners are picked uniformly)
+        if ratio >= 1 or rng.random() < ratio:
+            self.energy += delta
+        else:
+            self.flip_cost(j)
+            self.flip_cost(i)
+
+    def run(self, deadline: Deadline, competitor: float = 1.0, batch_size: int = SAMPLER_BATCH, tolerance: float = SAMPLER_TOLERANCE) -> SampleEstimate:
+        """ Samples until the safest tile is clearly separated (its interval is under the runner up's and under the competitor,
+        the best probability found elsewhere), or the intervals are all narrower than the tolerance, or the deadline. """
+        size = len(self.cells)
+        batches = []  # mean assignment of every full batch
+        counts, recorded = [0] * size, 0
+        samples, separated = 0, False
+        if size == 0:  # nothing to sample
+            return self.estimate(batches, samples, separated)
+        if not self.feasible.any():  # the outside can't take the mines left whatever these tiles hold
+            return self.estimate(batches, samples, separated)
+
+        while not deadline.expired():
+            for _ in range(size):  # one sweep between recordings
+                self.step()
+            if self.energy != 0 or not self.feasible[self.mines]:  # breaks a number or the mine count, not a solution
+                continue
+
+            for i, mine in enumerate(self.state):
+                counts[i] += mine
+            recorded += 1
+            samples += 1
+            if recorded < batch_size:
+                continue
+            batches.append(np.array(counts) / recorded)
+            counts, recorded = [0] * size, 0
+
+            if len(batches) >= SAMPLER_MIN_BATCHES and self.is_separated(batches, competitor, tolerance):
+                separated = True
+                break
+
+        if len(batches) == 0 and recorded > 0:  # out of time before a full batch, better than nothing (no interval though)
+            batches.append(np.array(counts) / recorded)
+        return self.estimate(batches, samples, separated)
+
+    def intervals(self, batches: list[np.ndarray]) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """ Returns the estimated probabilities and the low and high ends of their confidence intervals. """
+        means = np.array(batches)
+        probabilities = means.mean(axis=0)
+        if len(batches) < 2:  # no spread to measure yet
+            return probabilities, np.zeros(len(self.cells)), np.ones(len(self.cells))
+        spread = CONFIDENCE_Z * means.std(axis=0, ddof=1) / sqrt(len(batches))
+        return probabilities, np.clip(probabilities - spread, 0, 1), np.clip(probabilities + spread, 0, 1)
+
+    def is_separated(self, batches: list[np.ndarray], competitor: float, tolerance: float) -> bool:
+        """ Returns whether more samples can't change which tile is the safest (or that it's worse than the competitor). """
+        probabilities, low, high = self.intervals(batches)
+        if (high - low).max() < tolerance:  # everything is known closely enough
+            return True
+        safest = int(np.argmin(probabilities))
+        if low[safest] > competitor:  # even the safest sampled tile is worse than the best tile elsewhere
+            return True
+        others = np.delete(low, safest)
+        return high[safest] < competitor and (len(others) == 0 or high[safest] < others.min())
+
+    def estimate(self, batches: list[np.ndarray], samples: int, separated: bool) -> SampleEstimate:
+        """ Packs the batches into an estimate (no batches means no valid assignment was found in time). """
+        if len(batches) == 0:
+            return SampleEstimate({}, {}, 0, False)
+        probabilities, low, high = self.intervals(batches)
+        return SampleEstimate(dict(zip(self.cells, probabilities.tolist())),
+                              {cell: (float(lo), float(hi)) for cell, lo, hi in zip(self.cells, low, high)},
+                              samples, separated)
+
+
+def sample_probabilities(board, sampled: list[Component], counted: list[Component], deadline: Deadline = None, competitor: float = 1.0, start: list[int] = None) -> SampleEstimate:
+    """ Estimates the mine probabilities of the tiles of the sampled components (sampled together, their mines share the mines left),
+    the counted components and the interior make up the outside weights. Without a deadline sampling gets SAMPLER_BUDGET seconds. """
+    cells = [cell for component in sampled for cell in component.cells]
+    if len(cells) == 0:
+        return SampleEstimate({}, {}, 0, False)
+    constraints = [constraint for component in sampled for constraint in component.constraints]
+    if deadline is None or deadline.end is None:
+        deadline = Deadline(SAMPLER_BUDGET)
+    sampler = FrontierSampler(cells, constraints, outside_weights(board, counted, len(cells)), board.solver_random, start)
+    return sampler.run(deadline, competitor)
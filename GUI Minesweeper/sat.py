@@ -0,0 +1,385 @@
+""" SAT backend for frontier components too big to enumerate (expert density frontiers easily make one component of 60+ tiles).
+Every tile is a boolean variable (mine or not) and every revealed number is an "exactly value of these neighbours" constraint,
+encoded as plain clauses. A tile is forced when assuming the opposite of its value in a known solution is unsatisfiable.
+
+The solver is a small CDCL (conflict driven clause learning) solver with two watched literals per clause, VSIDS decisions,
+phase saving and restarts. The clauses only ever describe facts about the board (a number's constraint over all of its neighbours,
+revealed tiles are safe, flags are mines), so they stay true for the rest of the game: the clause database, including the learnt
+clauses, is kept across every move of the game and only grows as tiles get revealed. """
+
+from heapq import heappush, heappop
+from itertools import combinations
+from anytime import Deadline, OutOfTime, CHECK_INTERVAL
+from constants import *
+
+
+def exactly(count: int, literals: list[int]) -> list[list[int]]:
+    """ Encodes "exactly count of these literals are true" as clauses (binomial encoding, fine for the 8 neighbours of a tile):
+    no count+1 of them can all be true, and no len-count+1 of them can all be false. """
+    at_most = [[-literal for literal in subset] for subset in combinations(literals, count + 1)]
+    at_least = [list(subset) for subset in combinations(literals, len(literals) - count + 1)]
+    return at_most + at_least
+
+
+class CDCL:
+    """ Conflict driven clause learning SAT solver. Variables are 1 to variables, literals are +var (true) and -var (false). """
+
+    def __init__(self, variables: int):
+        self.values = [0] * (variables + 1)  # 1 true, -1 false, 0 unassigned
+        self.levels = [0] * (variables + 1)  # decision level every variable was assigned at
+        self.reasons = [None] * (variables + 1)  # clause that implied every variable (None for decisions and level 0 facts)
+        self.activity = [0.0] * (variables + 1)  # VSIDS score, bumped for variables in conflicts
+        self.phases = [False] * (variables + 1)  # last value of every variable, decisions reuse it (phase saving)
+        self.in_problem = bytearray(variables + 1)  # whether the variable shows up in any clause
+
+        self.watches = {}  # literal -> clauses watching it (the first two literals of a clause are its watched ones)
+        self.clauses, self.learnts = [], []
+        self.trail, self.trail_lim = [], []  # assigned literals in order, and where every decision level starts on the trail
+        self.head = 0  # next trail literal to propagate
+        self.heap = []  # (-activity, variable) decision candidates, stale entries are skipped when popped
+        self.increment = 1.0  # activity bump, grows so recent conflicts weigh more
+        self.ok = True  # False once the clauses are unsatisfiable without any assumptions
+        self.model = None  # values of the last satisfying assignment
+        self.simplified = 0  # level 0 trail length at the last simplify
+        self.conflicts = self.decisions = 0
+
+    # === CLAUSES ===
+    def add_clause(self, literals: list[int]) -> bool:
+        """ Adds a clause (at level 0), returns False if the clauses became unsatisfiable. """
+        if not self.ok:
+            return False
+        self.backtrack(0)
+
+        clause = []
+        for literal in set(literals):
+            value = self.value(literal)
+            if value == 1 or -literal in literals:  # already satisfied, or always true
+                return True
+            if value == 0:
+                clause.append(literal)
+            self.register(abs(literal))
+
+        if len(clause) == 0:
+            self.ok = False
+        elif len(clause) == 1:  # unit, it's a fact
+            self.assign(clause[0], None)
+            self.ok = self.propagate() is None
+        else:
+            self.attach(clause)
+            self.clauses.append(clause)
+        return self.ok
+
+    def attach(self, clause: list[int]):
+        """ Starts watching the clause's first two literals. """
+        self.watches.setdefault(clause[0], []).append(clause)
+        self.watches.setdefault(clause[1], []).append(clause)
+
+    def register(self, var: int):
+        """ Makes the variable a decision candidate the first time it shows up in a clause. """
+        if not self.in_problem[var]:
+            self.in_problem[var] = 1
+            heappush(self.heap, (-self.activity[var], var))
+
+    def simplify(self):
+        """ At level 0, drops the clauses satisfied by level 0 facts and strips the literals they made false,
+        then rebuilds the watches. Most of a number's clauses die this way once its neighbours are revealed. """
+        self.watches = {}
+        for clauses in (self.clauses, self.learnts):
+            kept = []
+            for clause in clauses:
+                if any(self.value(literal) == 1 for literal in clause):
+                    continue
+                clause = [literal for literal in clause if self.value(literal) == 0]
+                # level 0 is fully propagated, so everything left should have at least two free literals
+                if len(clause) < 2:
+                    continue
+                self.attach(clause)
+                kept.append(clause)
+            clauses[:] = kept
+        self.simplified = len(self.trail)
+
+    def reduce_learnts(self):
+        """ Keeps the shorter half of the learnt clauses (they prune the most), so the database can't grow forever. """
+        self.learnts.sort(key=len)
+        del self.learnts[len(self.learnts) // 2:]
+        self.simplify()
+
+    # === ASSIGNMENTS ===
+    def value(self, literal: int) -> int:
+        """ Returns 1 if the literal is true, -1 if false, 0 if unassigned. """
+        value = self.values[abs(literal)]
+        return value if literal > 0 else -value
+
+    def assign(self, literal: int, reason: list[int] or None):
+        """ Makes the literal true at the current decision level. """
+        var = abs(literal)
+        self.values[var] = 1 if literal > 0 else -1
+        self.levels[var] = len(self.trail_lim)
+        self.reasons[var] = reason
+        self.trail.append(literal)
+
+    def backtrack(self, level: int):
+        """ Unassigns everything above the given decision level. """
+        if len(self.trail_lim) <= level:
+            return
+        start = self.trail_lim[level]
+        for literal in self.trail[start:]:
+            var = abs(literal)
+            self.phases[var] = literal > 0  # phase saving
+            self.values[var] = 0
+            self.reasons[var] = None
+            heappush(self.heap, (-self.activity[var], var))
+        del self.trail[start:]
+        del self.trail_lim[level:]
+        self.head = len(self.trail)
+
+    def propagate(self) -> list[int] or None:
+        """ Unit propagation with two watched literals, returns the conflicting clause if there's one. """
+        values, watches, trail = self.values, self.watches, self.trail
+
+        while self.head < len(trail):
+            false_literal = -trail[self.head]  # clauses watching this literal lost a watch
+            self.head += 1
+            watching = watches.get(false_literal)
+            if not watching:
+                continue
+
+            kept = []
+            for i, clause in enumerate(watching):
+                # keep the false watch in the second spot
+                if clause[0] == false_literal:
+                    clause[0], clause[1] = clause[1], false_literal
+                first = clause[0]
+                first_value = values[abs(first)] if first > 0 else -values[abs(first)]
+                if first_value == 1:  # clause is satisfied, keep watching
+                    kept.append(clause)
+                    continue
+
+                # look for another literal that isn't false to watch instead
+                for k in range(2, len(clause)):
+                    literal = clause[k]
+                    if (values[abs(literal)] if literal > 0 else -values[abs(literal)]) != -1:
+                        clause[1], clause[k] = literal, false_literal
+                        watches.setdefault(literal, []).append(clause)
+                        break
+                else:
+                    kept.append(clause)
+                    if first_value == -1:  # every literal is false, conflict
+                        kept.extend(watching[i + 1:])
+                        watches[false_literal] = kept
+                        self.head = len(trail)
+                        return clause
+                    self.assign(first, clause)  # only the first literal is left, it's implied
+
+            watches[false_literal] = kept
+        return None
+
+    # === CONFLICTS ===
+    def analyze(self, conflict: list[int]) -> tuple[list[int], int]:
+        """ Learns a clause from the conflict (first unique implication point), returns it and the level to backtrack to. """
+        level = len(self.trail_lim)
+        seen = set()
+        learnt = [0]  # first spot is for the asserting literal
+        counter = 0  # literals of the current level still to resolve
+        index = len(self.trail) - 1
+        clause, start = conflict, 0
+
+        while True:
+            for literal in clause[start:]:
+                var = abs(literal)
+                if var not in seen and self.levels[var] > 0:
+                    seen.add(var)
+                    self.bump(var)
+                    if self.levels[var] == level:
+                        counter += 1
+                    else:
+                        learnt.append(literal)
+
+            # walk back the trail to the next literal of the conflict
+            while abs(self.trail[index]) not in seen:
+                index -= 1
+            literal = self.trail[index]
+            index -= 1
+            counter -= 1
+            if counter == 0:  # it's the only literal of this level left, the unique implication point
+                break
+            clause, start = self.reasons[abs(literal)], 1  # resolve with its reason (first literal is the implied one)
+
+        learnt[0] = -literal
+        if len(learnt) == 1:
+            return learnt, 0
+
+        # backtrack to the second highest level in the clause, its literal becomes the second watch
+        second = max(range(1, len(learnt)), key=lambda i: self.levels[abs(learnt[i])])
+        learnt[1], learnt[second] = learnt[second], learnt[1]
+        return learnt, self.levels[abs(learnt[1])]
+
+    def bump(self, var: int):
+        """ Bumps the variable's activity (VSIDS), rescaling everything before the scores overflow. """
+        self.activity[var] += self.increment
+        if self.activity[var] > 1e100:
+            self.activity = [score * 1e-100 for score in self.activity]
+            self.increment *= 1e-100
+            self.heap = [(-self.activity[var], var) for var in range(len(self.values)) if self.in_problem[var] and self.values[var] == 0]
+            self.heap.sort()
+        elif self.values[var] == 0:
+            heappush(self.heap, (-self.activity[var], var))
+
+    def pick(self) -> int or None:
+        """ Pops the unassigned variable with the highest activity, None if every variable is assigned. """
+        while len(self.heap) > 0:
+            var = heappop(self.heap)[1]
+            if self.values[var] == 0:
+                return var
+        return None
+
+    # === SOLVING ===
+    def solve(self, assumptions: list[int] = (), max_learnts: int = 20000, deadline: Deadline = None) -> bool:
+        """ Returns whether the clauses are satisfiable with the assumptions all true, the solution is left in model.
+        The learnt clauses never depend on the assumptions, so they're kept for the next call.
+        Raises OutOfTime (back at level 0, with everything learnt so far kept) if the deadline passes during the search. """
+        if not self.ok:
+            return False
+        self.backtrack(0)
+        if len(self.learnts) > max_learnts:
+            self.reduce_learnts()
+        elif len(self.trail) > self.simplified:
+            self.simplify()
+
+        restart, since_restart = 100, 0  # conflicts before the next restart (grows by half every restart)
+        steps = 0  # search rounds (a propagation then a learnt clause or a decision), the deadline only gets checked every CHECK_INTERVAL of them
+        while True:
+            if deadline is not None:
+                steps += 1
+                if steps % CHECK_INTERVAL == 0 and deadline.expired():
+                    self.backtrack(0)
+                    raise OutOfTime
+
+            conflict = self.propagate()
+            if conflict is not None:
+                self.conflicts += 1
+                since_restart += 1
+                if len(self.trail_lim) == 0:  # conflict without any decisions, unsatisfiable for good
+                    self.ok = False
+                    return False
+
+                learnt, level = self.analyze(conflict)
+                self.backtrack(level)
+                if len(learnt) == 1:
+                    self.assign(learnt[0], None)  # new fact at level 0
+                else:
+                    self.attach(learnt)
+                    self.learnts.append(learnt)
+                    self.assign(learnt[0], learnt)
+                self.increment /= 0.95  # decay, by making future bumps worth more
+                continue
+
+            if since_restart >= restart:
+                self.backtrack(0)
+                restart, since_restart = int(restart * 1.5), 0
+                continue
+
+            # assumptions are the first decisions, one level each
+            level = len(self.trail_lim)
+            if level < len(assumptions):
+                literal = assumptions[level]
+                value = self.value(literal)
+                if value == -1:  # the clauses force the assumption false
+                    self.backtrack(0)
+                    return False
+                self.trail_lim.append(len(self.trail))
+                if value == 0:
+                    self.assign(literal, None)
+                continue
+
+            var = self.pick()
+            if var is None:  # everything is assigned without conflict
+                self.model = self.values[:]
+                self.backtrack(0)
+                return True
+            self.decisions += 1
+            self.trail_lim.append(len(self.trail))
+            self.assign(var if self.phases[var] else -var, None)
+
+
+class BoardSat:
+    """ The board's tiles as SAT variables (variable = flat index + 1, true = mine), kept for the whole game.
+    Numbers are encoded the first time a component they border is queried, and the revealed and flagged tiles
+    get added as facts as the game goes, so the clauses (and everything learnt from them) stay valid between moves. """
+
+    def __init__(self, board):
+        self.board = board
+        self.solver = CDCL(board.area)
+        self.encoded = set()  # numbers whose constraint is in the solver
+        self.tiles = set()  # tiles showing up in the solver's constraints
+        self.fixed = bytearray(board.area)  # tiles whose state was already given to the solver as a fact
+
+    def update(self, cells: list[int]):
+        """ Encodes every number bordering the given tiles that isn't encoded yet, then adds the facts of the tiles revealed or flagged since. """
+        board = self.board
+        states, values = board.states, board.values
+
+        for cell in cells:
+            for number in board.adjacent_indices(cell):
+                if number in self.encoded or states[number] != REVEALED or not 0 < values[number] < MINE_VALUE:
+                    continue
+                neighbours = board.adjacent_indices(number)
+                for clause in exactly(values[number], [tile + 1 for tile in neighbours]):
+                    self.solver.add_clause(clause)
+                self.encoded.add(number)
+                self.tiles.update(neighbours)
+
+        # revealed tiles are safe and flags are mines, for good
+        for tile in self.tiles:
+            if self.fixed[tile] or states[tile] == UNREVEALED:
+                continue
+            self.fixed[tile] = 1
+            self.solver.add_clause([-(tile + 1)] if states[tile] == REVEALED else [tile + 1])
+
+    def solution(self, cells: list[int], deadline: Deadline = None) -> list[int] or None:
+        """ Returns a mine assignment of the given tiles (1 for a mine) satisfying every number,
+        None if there's none or the deadline passed before one was found. """
+        self.update(cells)
+        try:
+            if not self.solver.solve(deadline=deadline):
+                return None
+        except OutOfTime:
+            return None
+        model = self.solver.model
+        return [int(model[cell + 1] == 1) for cell in cells]
+
+    def forced_tiles(self, cells: list[int], deadline: Deadline = None) -> tuple[set[int], set[int]]:
+        """ Returns the tiles (out of the given ones) that are safe and the ones that are mines in every solution.
+        Every tile takes at most one extra satisfiability call on top of the first: assume the opposite of its value
+        in a known solution, if that's unsatisfiable the tile is forced. Every solution found also rules out the tiles it flips.
+        If the deadline passes the tiles left are skipped, the ones already proven are still returned. """
+        self.update(cells)
+        solver = self.solver
+        try:
+            if not solver.solve(deadline=deadline):  # the constraints contradict each other (wrong flags)
+                return set(), set()
+        except OutOfTime:
+            return set(), set()
+
+        model = solver.model
+        flexible = {cell for cell in cells if model[cell + 1] == 0}  # tiles seen both ways (free tiles count too)
+        safe, mines = set(), set()
+
+        for cell in cells:
+            if cell in flexible:
+                continue
+            var = cell + 1
+            is_mine = model[var] == 1
+            try:
+                satisfiable = solver.solve([-var if is_mine else var], deadline=deadline)
+            except OutOfTime:
+                break
+            if satisfiable:  # the opposite is possible, so not forced
+                other = solver.model
+                flexible.update(tile for tile in cells if other[tile + 1] != model[tile + 1])
+            elif is_mine:
+                mines.add(cell)
+            else:
+                safe.add(cell)
+
+        return safe, mines
@@ -0,0 +1,621 @@
+# game engine
+from board import Board, Node
+from constants import *
+
+# data structures
+from disjoint_set import DisjointSet
+from constraints import frontier_constraints, split_components, solve_components
+from patterns import pattern_deductions
+from gaussian import FrontierEliminator
+from decomposition import decompose
+from sat import BoardSat
+from component_cache import component_cache
+from parallel import enumerate_components
+from probability import mine_probabilities
+from sampling import sample_probabilities
+from anytime import Deadline, Decision, trivial_moves, local_guess, best_guess
+from guess import GuessPolicy
+from endgame import EndgameSolver
+from zobrist import TranspositionTable
+from collections import deque
+
+""" The solver algorithms with no visuals, so the bot can run headless (batch runs, servers).
+The solver only looks at node states and leaves marks on the tiles it works on, it never touches colors.
+gui_solver.py mixes the same algorithms into the pygame game and draws the marks as they're made. """
+
+
+class SolverLogic:
+    """ Solver algorithms, mixed into a Board (HeadlessSolver) or into the pygame Minesweeper (gui_solver.Solver).
+    The annotation/logging hooks at the bottom are what the GUI overrides to show what the solver is doing. """
+
+    verbose = False  # prints what the solver is doing (the GUI turns this on)
+    chains = None  # disjoint-set of the revealed chain tiles, created by init_solver
+    dirty = None  # worklist of tiles to solve again, created by init_solver
+    border = None  # revealed numbers with unrevealed neighbours (where the frontier constraints come from), created by init_solver
+    move_budget = None  # seconds decide gets per move by default (None: no limit)
+    guessing = False  # whether solve_board guesses when nothing is certain (the GUI turns this on)
+    endgame_threshold = ENDGAME_THRESHOLD  # most unrevealed tiles for the endgame solver to take over (0 turns it off)
+    endgame_configurations = ENDGAME_CONFIGURATIONS  # most configurations the endgame solver searches over
+    endgame_nodes = ENDGAME_NODES  # most positions the endgame guess search visits
+
+    # === MAIN SOLVER CODE ===
+    def init_solver(self):
+        """ Initialize solver, startup code for bot. """
+        self.solved_count = self.flagged_count = 0
+        self.solved = bytearray(self.area)  # wipe the solved mark of every node in the grid
+        self.frontier = None  # enumerated frontier components of the current position (if still up to date)
+        self.dirty = deque()  # worklist of chain tiles next to a change (reveal or flag) since they were last solved
+        self.queued = bytearray(self.area)  # whether each tile is already in the worklist
+        self.unsolved = set()  # chain tiles that simple solve has tried and failed on
+        self.unsolved_counts = {}  # chain representative -> number of its tiles in unsolved (kept up to date on union, see link_chain)
+        self.walked = bytearray(self.area)  # whether solve_chain has been over each tile (tiles revealed later go through the worklist)
+        self.eliminator = FrontierEliminator()  # row reduction of the frontier (keeps unchanged components' results)
+        self.sat = BoardSat(self)  # SAT solver for components too big to enumerate (keeps its clauses for the whole game)
+        self.chain_queue = deque()  # chains to grind (solve_board fills it from the first lake scan)
+        self.table = TranspositionTable()  # solver evaluations by position (zobrist hash of the visible board)
+        self.guesser = GuessPolicy(self.table)  # picks guesses with a lookahead (keeps its picks in the table)
+        self.endgame = EndgameSolver(self, self.table, self.endgame_configurations, self.endgame_nodes, self.endgame_threshold)  # exact search once few tiles are left (keeps its results in the table)
+        self.lost_node = None  # tile a guess hit a mine on, if one did
+
+        # chains of revealed chain tiles and the numbers bordering the frontier, kept up to date on every change (see reveal_node)
+        self.chains = DisjointSet(self.area)
+        self.border = set()
+        for index in range(self.area):
+            if self.is_chain_tile(index):
+                self.link_chain(index)
+                if self.hidden[index] > 0:
+                    self.border.add(index)
+
+    def ensure_solver(self):
+        """ Initializes the solver if nothing did yet (the board was played without first_move or solve_board). """
+        if self.chains is None:
+            self.init_solver()
+
+    def first_move(self, node: Node):
+        """ Makes the first drop of the game (where solving will start), regenerating the board so it's empty. """
+        self.first_drop = node.get_coord()  # save this coord as the first drop coord
+        self.generate_empty_drop(node)  # regen board so there's a zero under choice
+        self.reveal(node)  # reveals spot once the 0 is found
+        self.init_solver()  # solver state of the new game, so decide and play_decision work without solve_board
+
+    def solve_board(self):
+        """ Solver algorithm, the whole bot algorithm. """
+        self.init_solver()  # initialize values
+
+        # [0] Random first drop (performed by the player and saved in a class variable)
+        initial_drop = self.get_node(*self.first_drop)
+
+
+        # [1] Get starting points for the algorithm (using lake scan)
+        # use append to enqueue, popleft to dequeue
+        self.chain_queue = deque(self.lake_scan(initial_drop))  # run initial lake scan and queue chains to solve
+        self.stagnated_queue = deque()  # keeps track of stagnated chains
+
+        # list the chains found
+        self.log(f'\nfound {len(self.chain_queue)} chains:', end=' ')
+        for chain in self.chain_queue:
+            self.log(str(chain.get_coord()), end=', ')
+        self.log()
+
+
+        while True:
+            # [2] While the queue of chains is not empty, pop and grind the next chain
+            self.grind_queue()
+
+            # [3] Use constraint solving over the frontier to break stagnated chains 😈
+            # list the chains that stagnated
+            self.log(f'\n{len(self.stagnated_queue)} stagnated chains:', end=' ')
+            for chain in self.stagnated_queue:
+                self.log(str(chain.get_coord()), end=', ')
+            self.log()
+
+            # stop when nothing stagnated (board solved) or nothing else can be deduced for certain,
+            # unless guessing is on, then guess until the board is won or a guess hits a mine
+            if len(self.stagnated_queue) == 0 or not self.break_stagnation():
+                if not self.guessing or self.is_win() or not self.make_guess():
+                    break
+            self.requeue_stagnated()  # grind the stagnated chains again with the new information
+
+        self.log('finished solve cycle')
+        self.log('component cache:', component_cache.stats())
+        self.log('transposition table:', self.table.stats())
+
+
+    def grind_queue(self):
+        """ Pops and grinds chains until the chain queue is empty, queueing the ones that stagnate. """
+        while len(self.chain_queue) > 0:
+            chain = self.chain_queue.popleft()  # pop chain to grind
+
+            # visuals
+            self.log('\ngrinding:', str(chain.get_coord()), '\n')
+            self.annotate(chain, CHAIN_START)  # mark chain's starting point
+            self.delay(0.3)
+
+            grind_result = self.grind_chain(chain)  # run grind chain
+            # if chain was not fully solved (stagnated) add to stagnated queue
+            if not grind_result:
+                self.stagnated_queue.append(chain)
+                self.log('\nchain stagnated:', str(chain.get_coord()), f'({self.measure_chain(chain)} tiles)\n')
+
+
+    # === LAKE SCAN ===
+    def lake_scan(self, start: Node, border: Node = None) -> set[Node]:
+        """ Lake scan, returns one tile (the chain's representative) of every chain bordering the lake. """
+        queue = deque([start])  # append to enqueue and popleft to dequeue
+        discovered = {start.index}  # hashset keeping track of already discovered tiles (flat indices)
+        bordering = set()  # flat indices of the chain tiles bordering the lake
+
+        self.pump_events()  # keeps the window responsive (only does something in the GUI)
+
+        while len(queue) > 0:
+            curr = queue.popleft()
+
+            # border is hit, mark it along with its adjacent chain tiles
+            if curr.value != 0:
+                if curr.index not in bordering:
+                    bordering.add(curr.index)
+                    self.annotate(curr, BORDER)  # mark chain tile as border
+                    self.mark_adjacent_chain(curr, bordering)  # mark the chain tiles linked to this border tile
+                continue  # don't adjacent tiles, can't traverse past border
+            # else it's a still an empty/lake node, so just mark it and continue
+            else:
+                self.annotate(curr, LAKE)
+                self.solver_delay(0.004)
+
+            # add adjacent nodes to the queue
+            for adj in self.adjacent_indices(curr.index):
+                if adj not in discovered:
+                    queue.append(self.node_at(adj))
+                    discovered.add(adj)
+
+        # the chains were already unioned as their tiles got revealed, so just look up the border tiles' representatives
+        representatives = {self.chains.find(index) for index in bordering}
+        # if border is given, remove its chain (it's the chain that's being solved)
+        if border is not None:
+            representatives.discard(self.chains.find(border.index))
+        return {self.node_at(index) for index in representatives}
+
+    def mark_adjacent_chain(self, node: Node, bordering: set[int]):
+        """ Marks the chain tiles adjacent to the given border tile as chain links (visual only). """
+        for adj in self.adjacent_indices(node.index):
+            # a link is a revealed chain tile that isn't on the lake border itself
+            if adj not in bordering and self.is_chain_tile(adj):
+                self.annotate(self.node_at(adj), CHAIN_LINK)
+
+    # === CHANGE TRACKING ===
+    def reveal_node(self, node: Node):
+        """ Reveals node like the game does, then links it to its chain if it's a chain tile and queues the tiles around it. """
+        super().reveal_node(node)
+        if self.chains is not None and self.is_chain_tile(node.index):
+            self.link_chain(node.index)
+        if self.dirty is not None:
+            self.mark_dirty(node.index)
+        if self.border is not None:
+            self.update_border(node.index)
+
+    def flag(self, node: Node):
+        """ Flags (or unflags) node like the game does, then queues the tiles around it. """
+        super().flag(node)
+        if self.dirty is not None:
+            self.mark_dirty(node.index)
+        if self.border is not None:
+            self.update_border(node.index)
+
+    def mark_dirty(self, index: int):
+        """ Queues the unsolved chain tiles affected by a change on the given tile (the tile itself and its neighbours). """
+        queued, solved = self.queued, self.solved
+        for tile in (index, *self.adjacent_indices(index)):
+            if not queued[tile] and not solved[tile] and self.is_chain_tile(tile):
+                queued[tile] = 1
+                self.dirty.append(tile)
+
+    def update_border(self, index: int):
+        """ Adds or removes the tiles around a change on the given tile from the border numbers
+        (a number joins when it's revealed next to unrevealed tiles, and leaves when the last of them is revealed or flagged). """
+        border, hidden = self.border, self.hidden
+        for tile in (index, *self.adjacent_indices(index)):
+            if hidden[tile] > 0 and self.is_chain_tile(tile):
+                border.add(tile)
+            else:
+                border.discard(tile)
+
+    def link_chain(self, index: int):
+        """ Adds a revealed chain tile to the chains structure and unions it with its adjacent revealed chain tiles. """
+        chains = self.chains
+        if not chains.exists(index):
+            chains.new(index)
+        for adj in self.adjacent_indices(index):
+            if self.is_chain_tile(adj):
+                # adjacent tile may not be in the structure yet (while init_solver is still adding them)
+                if not chains.exists(adj):
+                    chains.new(adj)
+                self.union_chains(index, adj)
+
+    def union_chains(self, index: int, adj: int):
+        """ Unions the chains of the two tiles, adding up their unsolved tile counts under the new representative. """
+        chains, counts = self.chains, self.unsolved_counts
+        reprA, reprB = chains.find(index), chains.find(adj)
+        if chains.union(reprA, reprB):
+            unsolved = counts.pop(reprA, 0) + counts.pop(reprB, 0)
+            if unsolved > 0:
+                counts[chains.find(reprA)] = unsolved
+
+    def set_unsolved(self, index: int, unsolved: bool):
+        """ Adds the chain tile to unsolved or removes it, keeping its chain's unsolved count up to date. """
+        if unsolved == (index in self.unsolved):
+            return
+        representative = self.chains.find(index)
+        if unsolved:
+            self.unsolved.add(index)
+            self.unsolved_counts[representative] = self.unsolved_counts.get(representative, 0) + 1
+        else:
+            self.unsolved.discard(index)
+            self.unsolved_counts[representative] -= 1
+            if self.unsolved_counts[representative] == 0:
+                del self.unsolved_counts[representative]
+
+    def is_chain_tile(self, index: int) -> bool:
+        """ Returns whether the tile at the flat index is a revealed chain tile. """
+        return self.states[index] == REVEALED and 0 < self.values[index] < MINE_VALUE
+
+
+    # === CHAIN SOLVING ===
+    def grind_chain(self, chain_start: Node) -> bool:
+        """ Solves the chain once through the first time it's ground, then only solves the tiles around every change until nothing changes. """
+        """ NOTE: every reveal and flag queues its adjacent chain tiles (see mark_dirty), so instead of rerunning
+        solve chain over the whole chain until progress stops, the work is proportional to the number of changes.
+        Only the tiles that were already revealed when the solver started need the pass, the worklist has every tile revealed since. """
+        if not self.walked[chain_start.index]:
+            self.solve_chain(chain_start)  # one pass over the part of the chain no pass has been over yet
+        self.solve_dirty()  # then only the tiles next to something that changed
+
+        # chain is fully solved if none of its tiles is left unsolved
+        return self.unsolved_counts.get(self.chains.find(chain_start.index), 0) == 0
+
+    def solve_chain(self, chain_start: Node):
+        """ Follows chain of tiles and simple solves each one, stopping at tiles an earlier pass already went over. """
+        queue = deque([chain_start])  # use append to enqueue, popleft to dequeue
+        walked = self.walked  # tiles already discovered, by this pass or an earlier one (flat indices)
+        walked[chain_start.index] = 1
+
+        while len(queue) > 0:
+            curr = queue.popleft()
+
+            self.annotate(curr, CURRENT)
+
+            """ NOTE: when processing a node, we will be traversing nodes that have been processed before
+            in past calls of the follow chain function. those nodes may or may not have been fully solved.
+            so first we have to check for that before we try to solving. """
+
+            # check if tile is not yet solved
+            if curr.is_solved() is False:
+                """ NOTE: note that, this tile could've been solved by the actions of a tile next to it
+                but not marked as solved, so make note of that and try to include that when considering efficiency. """
+                self.solve_tile(curr)
+
+            else:
+                # mark back as solved (because it was marked current at the start of the iteration)
+                self.annotate(curr, SOLVED)
+
+            # add adjacent nodes to queue
+            for adj in self.adjacent_indices(curr.index):
+                # add adj node if it's revealed and a chain tile
+                if self.is_chain_tile(adj) and not walked[adj]:
+                    queue.append(self.node_at(adj))
+                    walked[adj] = 1
+
+    def solve_dirty(self):
+        """ Simple solves the tiles in the worklist until it's empty, the changes they make queue more tiles. """
+        dirty, queued = self.dirty, self.queued
+        while len(dirty) > 0:
+            index = dirty.popleft()
+            queued[index] = 0
+            node = self.node_at(index)
+            if not node.is_solved():  # could've been solved since it was queued
+                self.annotate(node, CURRENT)
+                self.solve_tile(node)
+
+    def solve_tile(self, node: Node):
+        """ Simple solves the tile and marks it solved, or visited if it couldn't be solved yet. """
+        # mark node solved if was able to solve, else mark it visited
+        if self.simple_solve(node):
+            self.set_unsolved(node.index, False)
+            self.annotate(node, SOLVED)
+        # if node was not solved, mark it visited (the GUI also draws the number of real mines left)
+        else:
+            self.set_unsolved(node.index, True)
+            self.annotate(node, VISITED)
+
+    def simple_solve(self, node: Node) -> bool:
+        """ Runs the simple solving algorithm and returns whether tile was solved. """
+        # surrounding unrevealed tiles (kept up to date by the board, no neighbour scan)
+        unrevealed_count = self.hidden[node.index]
+
+        # mine count minus flag count is equal to mines actually left to find
+        mines_left = self.mines_left(node)
+
+        # if the mines left match the unrevealed count, then they're all mines so flag them
+        if mines_left == unrevealed_count:
+            # if they're both 0, then the tile was solved but not marked
+            # (meaning it was solved because of actions of adjacent tiles)
+            if mines_left == 0:
+                node.solved = True
+                self.solved_count += 1
+                return True
+            # flags all unrevealed tiles, as they have to be mines
+            self.flag_adjacent_nodes(node)
+        # no more mines or flags left, so reveal the rest of the tiles
+        elif mines_left == 0:
+            self.reveal_adjacent_nodes(node)
+        # not enough information to solve the tile
+        else:
+            return False
+
+        # if tile was able to solve, returns True
+        node.solved = True
+        self.solved_count += 1
+        return True
+
+    # === CHAIN SOLVING HELPERS ===
+    def measure_chain(self, chain_start: Node) -> int:
+        """ Returns the number of tiles in the chain (size of its disjoint-set, no traversal needed). """
+        return self.chains.size(chain_start.index)
+
+    def count_adjacent_tiles(self, node: Node) -> tuple[int, int]:
+        """ Returns count of adjacent unrevealed tiles and flags (read from the board's neighbour counters). """
+        return self.hidden[node.index], self.flags[node.index]
+
+    def reveal_adjacent_nodes(self, node: Node):
+        """ Reveals all adjacent unrevealed tiles. """
+        for adj in self.adjacent_nodes(node):
+            # if not unrevealed, skip
+            if not adj.is_unrevealed():
+                continue
+            self.reveal(adj)  # reveal node first
+            # check if lake is found and scan
+            if not adj.is_empty():  # is not lake, no need to scan
+                continue
+
+            # lake is found, scan and add new chains to chain queue
+            new_chains = self.lake_scan(adj, border=node)
+            if len(new_chains) > 0:
+                self.log(f'found {len(new_chains)} new chains')
+                self.chain_queue.extend(new_chains)  # add newly discovered chains to the chain queue
+            self.delay(0.03)
+
+    def flag_adjacent_nodes(self, node: Node):
+        """ Flags all adjacent unrevealed tiles. """
+        for adj in self.adjacent_nodes(node):
+            if adj.is_unrevealed():  # if unrevealed, flag it
+                self.flag(adj)
+                self.flagged_count += 1
+
+
+    # === BREAKING STAGNATION ===
+    def break_stagnation(self) -> bool:
+        """ Runs the frontier deductions and plays every tile they found to be certain, returns whether it made progress.
+        Cheapest first: pairwise patterns, then row reduction, and counting solutions only when both find nothing
+        (and the endgame solver with the global mine count when only a few tiles are left). """
+        constraints = frontier_constraints(self, self.border)
+        components = None
+
+        # cheap pass, subset/superset patterns between overlapping numbers
+        safe, mines = pattern_deductions(constraints)
+        self.log(f'patterns: {len(safe)} safe tiles, {len(mines)} mines')
+
+        # patterns found nothing, row reduce the frontier components (only the ones that changed since last time)
+        if len(safe) + len(mines) == 0:
+            components = decompose(split_components(constraints, self.cols))  # long thin chains get counted by DP
+            safe, mines = self.eliminator.deductions(components)
+            self.log(f'row reduction: {len(components)} components, {len(safe)} safe tiles, {len(mines)} mines')
+
+        # still nothing, count the frontier components, and ask the SAT solver about the ones too big and too wide to count
+        if len(safe) + len(mines) == 0:
+            enumerate_components(components)  # the big components get spread over the process pool
+            safe, mines = solve_components(components)
+            self.log(f'counting: {len(safe)} safe tiles, {len(mines)} mines')
+            for component in components:
+                if not component.enumerated:
+                    forced_safe, forced_mines = self.sat.forced_tiles(component.cells)
+                    safe |= forced_safe
+                    mines |= forced_mines
+                    self.log(f'sat ({len(component)} tiles): {len(forced_safe)} safe tiles, {len(forced_mines)} mines')
+
+        # few tiles left, list every configuration with the mines left (the global count settles what the numbers can't)
+        if len(safe) + len(mines) == 0:
+            result = self.endgame.solve()
+            if result is not None:
+                _, safe, mines, _, _, _ = result
+                self.log(f'endgame: {len(safe)} safe tiles, {len(mines)} mines')
+
+        self.play_tiles(safe, mines)
+        progress = len(safe) + len(mines) > 0
+        # the components only describe the position if nothing was played, keep them for the probabilities
+        self.frontier = None if progress else components
+        return progress
+
+    def play_tiles(self, safe: set[int], mines: set[int]):
+        """ Flags the mines and reveals the safe tiles, queueing the chains of any lake they open. """
+        # flag mines first, so a floodfill from a safe tile can never run into them
+        for index in mines:
+            if self.states[index] == UNREVEALED:
+                self.flag(self.node_at(index))
+                self.flagged_count += 1
+
+        for index in safe:
+            node = self.node_at(index)
+            if not node.is_unrevealed():  # already revealed by the floodfill of another safe tile
+                continue
+            self.reveal(node)
+            # lake is found, scan and add its chains to the chain queue
+            if node.is_empty():
+                self.chain_queue.extend(self.lake_scan(node))
+
+    def requeue_stagnated(self):
+        """ Moves the stagnated chains back into the chain queue, skipping chains that are already queued
+        (stagnated chains can get merged together, or be found again by a lake scan). """
+        queued = {self.chains.find(chain.index) for chain in self.chain_queue}
+        while len(self.stagnated_queue) > 0:
+            chain = self.stagnated_queue.popleft()
+            representative = self.chains.find(chain.index)
+            if representative not in queued:
+                queued.add(representative)
+                self.chain_queue.append(chain)
+
+    # === PROBABILITIES ===
+    def tile_probabilities(self) -> tuple[dict[int, float], float]:
+        """ Returns the exact probability that each frontier tile is a mine (flat index -> probability),
+        and the probability of any interior tile, weighted by the mines left on the board (see probability.py). """
+        return mine_probabilities(self, self.frontier)
+
+    # === TIME-BUDGETED MOVES ===
+    def decide(self, budget: float = None) -> Decision:
+        """ Decides the next move within the time budget (seconds, defaults to move_budget), without playing it.
+        Runs the stages cheapest first: simple solve, patterns, row reduction, counting, SAT, the endgame search (few tiles left),
+        then probabilities and sampling, and returns as soon as a stage finds certain tiles, or the best decision so far when the budget runs out (see anytime.py). """
+        deadline = Deadline(self.move_budget if budget is None else budget)
+        self.ensure_solver()
+        self.table.new_generation()  # entries of past moves give way to this move's
+
+        # [1] simple solve, every number on its own
+        safe, mines = trivial_moves(self, self.border, deadline)
+        if len(safe) + len(mines) > 0:
+            return Decision(safe, mines, stage='simple')
+
+        # [2] subset/superset patterns between overlapping numbers
+        constraints = frontier_constraints(self, self.border, deadline)
+        if not deadline.expired():
+            safe, mines = pattern_deductions(constraints)
+            if len(safe) + len(mines) > 0:
+                return Decision(safe, mines, stage='patterns')
+
+        # [3] exact stages over the frontier components, row reduction then counting then SAT
+        components = decompose(split_components(constraints, self.cols))
+        if not deadline.expired():
+            safe, mines = self.eliminator.deductions(components, deadline)
+            if len(safe) + len(mines) > 0:
+                return Decision(safe, mines, stage='row reduction')
+
+        if not deadline.expired():
+            enumerate_components(components, deadline=deadline)
+            for component in components:
+                if component.enumerated:
+                    safe.update(component.safe_cells())
+                    mines.update(component.mine_cells())
+            if len(safe) + len(mines) > 0:
+                return Decision(safe, mines, stage='counting')
+
+        for component in components:
+            if deadline.expired():
+                break
+            if not component.enumerated:
+                safe, mines = self.sat.forced_tiles(component.cells, deadline)
+                if len(safe) + len(mines) > 0:
+                    return Decision(safe, mines, stage='sat')
+
+        # [4] few tiles left, exact search over every configuration with the mines left, for forced tiles or the guess most likely to win
+        if not deadline.expired():
+            result = self.endgame.solve(deadline)
+            if result is not None:
+                _, safe, mines, guess, probability, chance = result
+                if len(safe) + len(mines) > 0:
+                    return Decision(safe, mines, stage='endgame')
+                if guess is not None:
+                    self.log(f'endgame: {chance:.3f} chance of winning')
+                    return Decision(guess=guess, probability=probability, stage='endgame')
+
+        # [5] nothing certain, guess the tile least likely to be a mine
+        if deadline.expired():  # no time for probabilities, estimate from the numbers around each tile
+            guess, probability = local_guess(self, self.border)
+            return Decision(guess=guess, probability=probability, exact=False, stage='local estimate')
+        # components that didn't get counted in time (or are too big) count as interior tiles here, so the probabilities are estimates
+        counted = [component for component in components if component.enumerated]
+        uncounted = [component for component in components if not component.enumerated]
+        probabilities, interior_probability = mine_probabilities(self, counted)
+        frontier = {cell for members, _ in constraints for cell in members}
+        exact, stage = len(uncounted) == 0, 'probabilities'
+
+        # [6] sample the uncounted components with the time left, starting the chain from a SAT solution
+        if not exact and not deadline.expired():
+            _, competitor = best_guess(self, probabilities, interior_probability, frontier)
+            start = self.sat.solution([cell for component in uncounted for cell in component.cells], deadline)
+            estimate = sample_probabilities(self, uncounted, counted, deadline, competitor, start)
+            self.log(f'sampling: {estimate.samples} samples, separated: {estimate.separated}')
+            probabilities.update(estimate.probabilities)
+            stage = 'sampling'
+
+        # [7] pick the guess, with a lookahead over the safest candidates if there's time left
+        if deadline.expired():
+            guess, probability = best_guess(self, probabilities, interior_probability, frontier)
+        else:
+            guess, probability = self.guesser.choose(self, constraints, probabilities, interior_probability, frontier)
+            stage = 'guess'
+        return Decision(guess=guess, probability=probability, exact=exact, stage=stage)
+
+    def make_guess(self) -> bool:
+        """ Plays the decision of decide when simple solving and the frontier deductions are out of moves (certain tiles
+        if a stage they don't run finds some, else a guess), returns False if the guess hit a mine or nothing was left. """
+        decision = self.decide()
+        self.log('\nguessing:', decision)
+        if not decision.is_certain() and decision.guess is None:
+            return False
+        if not self.play_decision(decision):
+            self.lost_node = self.node_at(decision.guess)
+            return False
+
+        # the revealed numbers start new chains (the guess can land away from every known chain)
+        for index in decision.safe | ({decision.guess} if decision.guess is not None else set()):
+            if self.is_chain_tile(index):
+                self.chain_queue.append(self.node_at(index))
+        return True
+
+    def play_decision(self, decision: Decision) -> bool:
+        """ Plays the decision (its certain tiles, or its guess), returns False if the guess hit a mine. """
+        self.ensure_solver()
+        if decision.is_certain():
+            self.play_tiles(decision.safe, decision.mines)
+            return True
+        if decision.guess is None:
+            return True
+        node = self.node_at(decision.guess)
+        if self.is_loss(node):
+            node.reveal()  # shows the mine, without counting it as revealed
+            self.draw_revealed(node)
+            self.update_display()
+            return False
+        self.play_tiles({decision.guess}, set())
+        return True
+
+    # === HELPER FUNCTIONS ===
+    def determine_if_solved(self, node: Node) -> bool:
+        """ Calculates if the node is solved by checking the adjacent nodes. """
+        for adj in self.adjacent_nodes(node):
+            # aborts immediately if any adjacent node is unrevealed
+            if adj.is_unrevealed():
+                return False
+        return True
+
+    # === ANNOTATION HOOKS ===
+    """ NOTE: the solver calls these while it works, headless they only record the mark
+    (or do nothing), gui_solver.py overrides them to draw and animate what's going on. """
+    def annotate(self, node: Node, mark: int):
+        """ Leaves a solver mark on the node. """
+        self.marks[node.index] = mark
+
+    def log(self, *args, **kwargs):
+        """ Prints solver progress, only if the solver is verbose. """
+        if self.verbose:
+            print(*args, **kwargs)
+
+    def solver_delay(self, wait: float = SOLVER_WAIT):
+        """ Delay some amount of time, for animation/visual purposes (no-op when headless). """
+
+    def pump_events(self):
+        """ Keeps the window from timing out during long solves (no-op when headless). """
+
+class HeadlessSolver(SolverLogic, Board):
+    """ The solver running on the headless Board, no pygame at all. """
+
+    def __init__(self, rows: int = ROWS, cols: int = COLS, mine_spawn: float or int = MINE_SPAWN, seed: int = None, game: int = 0):
+        super().__init__(rows, cols, mine_spawn, seed, game)
+        self.first_drop = None  # keeps track of the initial drop (that's where solving will start)
@@ -0,0 +1,81 @@
+""" Zobrist hashing of what a player can see on the board (revealed numbers and flags), and a transposition table keyed by it.
+Every (tile, what it shows) pair gets a random 64 bit key and a position's hash is the xor of the keys of everything shown,
+so the board keeps it up to date with one xor per change (see reveal_node and flag) instead of hashing the whole board,
+and the same knowledge state gets the same hash whatever order the moves were made in.
+Keys are worked out when they're needed instead of stored, so a board costs nothing extra until a tile changes. """
+
+from sys import getsizeof
+from constants import *
+
+
+ZOBRIST_CODES = 11  # what a tile can show: revealed 0 to 8, revealed mine (MINE_VALUE), or a flag (FLAG_CODE)
+FLAG_CODE = 10
+Entry = tuple[int, int, int, object]  # (full hash, depth, generation, value)
+MASK_64 = 2**64 - 1
+GOLDEN_GAMMA = 0x9E3779B97F4A7C15  # splitmix64's step between states
+
+
+def zobrist_key(index: int, code: int) -> int:
+    """ Returns the random key of the tile at the flat index showing the given code, the (index * ZOBRIST_CODES + code)th output
+    of a splitmix64 stream seeded with ZOBRIST_SEED. Fixed seed, so hashes are the same across runs, processes and boards. """
+    z = (ZOBRIST_SEED + (index * ZOBRIST_CODES + code + 1) * GOLDEN_GAMMA) & MASK_64
+    z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & MASK_64
+    z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & MASK_64
+    return z ^ (z >> 31)
+
+
+class TranspositionTable:
+    """ Fixed number of slots (from a memory cap), a position goes in the slot of its hash modulo the number of slots.
+    When a slot is taken by another position, the new entry replaces it if it's from a deeper (more expensive) search
+    or if the old one is from an older generation (positions of past moves rarely come back), otherwise the old one stays. """
+
+    def __init__(self, memory: int = TABLE_MEMORY):
+        self.size = max(1, memory // TABLE_ENTRY_BYTES)  # number of slots (the memory cap if every slot gets an entry)
+        self.slots = [None] * self.size  # slot -> entry or None
+        self.generation = 0  # bumped every move (see new_generation)
+        self.hits = self.misses = self.evictions = self.rejections = 0
+        self.used = 0  # slots taken
+
+    def __len__(self) -> int:
+        return self.used
+
+    def new_generation(self):
+        """ Marks the entries stored so far as old, so they give way to the next move's entries. """
+        self.generation += 1
+
+    def get(self, key: int, depth: int = 0) -> object or None:
+        """ Returns the value stored for the position from a search at least as deep, or None. """
+        entry = self.slots[key % self.size]
+        if entry is None or entry[0] != key or entry[1] < depth:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry[3]
+
+    def put(self, key: int, value: object, depth: int = 0):
+        """ Stores the value of the position, following the replacement policy if its slot is taken. """
+        slot = key % self.size
+        entry = self.slots[slot]
+        if entry is None:
+            self.used += 1
+        elif entry[0] != key:  # another position
+            if entry[1] > depth and entry[2] == self.generation:  # deeper and still current, keep it
+                self.rejections += 1
+                return
+            self.evictions += 1
+        self.slots[slot] = (key, depth, self.generation, value)
+
+    def clear(self):
+        """ Empties the table and resets its stats. """
+        self.slots = [None] * self.size
+        self.used = self.hits = self.misses = self.evictions = self.rejections = 0
+
+    def hit_rate(self) -> float:
+        """ Returns the share of lookups that were hits. """
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups > 0 else 0.0
+
+    def stats(self) -> dict[str, int or float]:
+        """ Returns the table's stats (used slots, hits, misses, evictions, rejected stores, hit rate and approximate memory in bytes). """
+        return {'entries': self.used, 'slots': self.size, 'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions,
+                'rejections': self.rejections, 'hit_rate': self.hit_rate(), 'bytes': getsizeof(self.slots) + self.used * TABLE_ENTRY_BYTES}